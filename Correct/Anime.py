@@ -1,144 +1,107 @@
-from fractions import Fraction
 import numpy as np
 import matplotlib.pyplot as plt
 from matplotlib.animation import FuncAnimation, PillowWriter
-from shapely.geometry import Point
-from shapely.geometry.polygon import Polygon
+
+from bounce_trajectory import PolygonBounce
+from circle_areas import volume_readouts
+from feasible_grid import FeasibleGrid
 
 # Initial blue point
 initial_blue = [0.5, 0.25]
 
-# Function to update the plot based on the blue point position
-def update_plot(blue_x, blue_y):
-    # Set the blue point
-    blue = [Fraction(blue_x), Fraction(blue_y)]
-
-    # Create a grid of red points to evaluate feasibility
-    x = np.linspace(-1, 2, 600)
-    y = np.linspace(-1, 2, 600)
-    X, Y = np.meshgrid(x, y)
-
-    # Calculate midpoint and perpendicular slope for each red point
-    mid_x = (X + float(blue[0])) / 2
-    mid_y = (Y + float(blue[1])) / 2
-
-    slope = (Y - float(blue[1])) / (X - float(blue[0]))
-    with np.errstate(divide='ignore', invalid='ignore'):
-        perp_slope = -1 / slope
+# Number of animation frames, and where to export them (e.g. "anime.gif" or "anime.mp4"; None to only show)
+num_frames = 800
+save_path = None
 
-    # Calculate the intercept of the perpendicular bisector
-    intercept = mid_y - perp_slope * mid_x
+# Calculate the centers of the circles where red points are feasible
+center_x_1 = 0
+center_y_1 = 0
+center_x_2 = 1
+center_y_2 = 0
 
-    # Determine if the perpendicular bisector intersects the x-axis between values of 0 and 1
-    intersect = -intercept / perp_slope  # x-intercept when y = 0
-    feasible_region = (intersect >= 0) & (intersect <= 1)
+# Create the grid of red points used to evaluate feasibility once, covering
+# only the unit square the plot shows
+grid_resolution = 600
+feasible_grid = FeasibleGrid(extent=(0, 1, 0, 1), resolution=grid_resolution)
 
-    # Calculate the centers of the circles where red points are feasible
-    center_x_1 = 0
-    center_y_1 = 0
-    center_x_2 = 1
-    center_y_2 = 0
 
-    # Define the unit square polygon
-    unit_square = Polygon([(0, 0), (1, 0), (1, 1), (0, 1)])
-
-    # Calculate the area of the circles inside the unit square
+# Function to format the volume information for a blue point
+def volume_text(blue_x, blue_y, volume_1, volume_2, overlap_volume, total_volume):
     radius_1 = np.sqrt((blue_x - center_x_1) ** 2 + (blue_y - center_y_1) ** 2)
     radius_2 = np.sqrt((blue_x - center_x_2) ** 2 + (blue_y - center_y_2) ** 2)
+    return (f"Volume of Sphere 1 (inside unit square): {volume_1:.6f}\n"
+            f"Volume of Sphere 2 (inside unit square): {volume_2:.6f}\n"
+            f"Overlap Volume (inside unit square): {overlap_volume:.6f}\n"
+            f"Total Volume (inside unit square): {total_volume:.6f}\n\n"
+            f"Equation of Sphere 1: (x - {center_x_1})^2 + (y - {center_y_1})^2 = {radius_1**2:.6f}\n"
+            f"Equation of Sphere 2: (x - {center_x_2})^2 + (y - {center_y_2})^2 = {radius_2**2:.6f}\n")
 
-    circle_1 = Point(center_x_1, center_y_1).buffer(radius_1)
-    circle_2 = Point(center_x_2, center_y_2).buffer(radius_2)
 
-    intersection = circle_1.intersection(circle_2)
-    circle_1_area = circle_1.intersection(unit_square).area
-    circle_2_area = circle_2.intersection(unit_square).area
-    overlap_area = intersection.intersection(unit_square).area
+# Create the plot
+fig, ax = plt.subplots(figsize=(12, 11))
+plt.subplots_adjust(left=-.27, bottom=0.3)
 
-    volume_1 = circle_1_area
-    volume_2 = circle_2_area
-    overlap_volume = overlap_area
+# Plot the initial boundaries of the map
+boundary_points = np.array([[0, 0], [1, 0], [0.5, 0.5], [0, 0]])
+ax.plot(boundary_points[:, 0], boundary_points[:, 1], 'k-', linewidth=1, label='Triangle Boundary')
 
-    total_volume = max(volume_1 - overlap_volume, 0) + max(volume_2 - overlap_volume, 0)
+# Create the artists that every frame updates in place
+blue_marker, = ax.plot([], [], 'bo', label='Blue Point')
+ax.plot(center_x_1, center_y_1, 'rx', label='Circle Center 1')
+ax.plot(center_x_2, center_y_2, 'gx', label='Circle Center 2')
 
-    # Clear the plot
-    ax.clear()
+# Plot heatmap of feasible region
+heatmap = ax.imshow(np.zeros((grid_resolution, grid_resolution)), extent=[0, 1, 0, 1], origin='lower', cmap='viridis', alpha=0.5, vmin=0, vmax=1)  # The current colormap is set to 'viridis'. Some other options you can use are 'plasma', 'inferno', 'magma', 'cividis', 'hot', 'cool', 'spring', 'summer', 'autumn', 'winter', and 'jet'. You can change the 'cmap' parameter to one of these to achieve different visual effects.
 
-    # Plot the initial boundaries of the map
-    boundary_points = np.array([[0, 0], [1, 0], [0.5, 0.5], [0, 0]])
-    ax.plot(boundary_points[:, 0], boundary_points[:, 1], 'k-', linewidth=1, label='Triangle Boundary')
+# Set plot limits
+ax.set_xlim(0, 1)
+ax.set_ylim(0, 1)
 
-    # Plot the blue point
-    ax.plot(blue[0], blue[1], 'bo', label='Blue Point')
+# Add labels and legend
+ax.set_xlabel('X-axis')
+ax.set_ylabel('Y-axis')
+ax.set_title('Feasible Region for Red Points (Heatmap)')
+ax.legend(loc='best', fontsize='medium', frameon=True)
 
-    # Plot the centers of the circles
-    ax.plot(center_x_1, center_y_1, 'rx', label='Circle Center 1')
-    ax.plot(center_x_2, center_y_2, 'gx', label='Circle Center 2')
+# Display volume information in its own axes to the right of the plot, so blitting redraws it
+ax_position = ax.get_position()
+text_ax = fig.add_axes([ax_position.x1 + 0.05 * ax_position.width, ax_position.y0,
+                        max(1 - ax_position.x1 - 0.05 * ax_position.width, 0.01), ax_position.height])
+text_ax.axis('off')
+volume_label = text_ax.text(0, 0.5, '', transform=text_ax.transAxes, fontsize=12, verticalalignment='center', horizontalalignment='left', bbox=dict(facecolor='white', alpha=0.5))
 
-    # Plot heatmap of feasible region
-    ax.imshow(feasible_region, extent=[-1, 2, -1, 2], origin='lower', cmap='viridis', alpha=0.5)  # The current colormap is set to 'viridis'. Some other options you can use are 'plasma', 'inferno', 'magma', 'cividis', 'hot', 'cool', 'spring', 'summer', 'autumn', 'winter', and 'jet'. You can change the 'cmap' parameter to one of these to achieve different visual effects.
 
-    # Set plot limits
-    ax.set_xlim(0, 1)
-    ax.set_ylim(0, 1)
+# Function to draw a blue point with its feasible region and volume readouts
+def draw_frame(blue_x, blue_y, mask, volumes):
+    blue_marker.set_data([blue_x], [blue_y])
+    heatmap.set_data(mask)
+    volume_label.set_text(volume_text(blue_x, blue_y, *volumes))
+    return heatmap, blue_marker, volume_label
 
-    # Add labels and legend
-    ax.set_xlabel('X-axis')
-    ax.set_ylabel('Y-axis')
-    ax.set_title('Feasible Region for Red Points (Heatmap)')
-    ax.legend(loc='best', fontsize='medium', frameon=True)
 
-    # Display volume information
-    volume_text = (f"Volume of Sphere 1 (inside unit square): {volume_1:.6f}\n"
-                f"Volume of Sphere 2 (inside unit square): {volume_2:.6f}\n"
-                f"Overlap Volume (inside unit square): {overlap_volume:.6f}\n"
-                f"Total Volume (inside unit square): {total_volume:.6f}\n\n"
-                f"Equation of Sphere 1: (x - {center_x_1})^2 + (y - {center_y_1})^2 = {radius_1**2:.6f}\n"
-                f"Equation of Sphere 2: (x - {center_x_2})^2 + (y - {center_y_2})^2 = {radius_2**2:.6f}\n")
-    ax.text(1.05, 0.5, volume_text, transform=ax.transAxes, fontsize=12, verticalalignment='center', horizontalalignment='left', bbox=dict(facecolor='white', alpha=0.5))
+# Function to update the plot based on the blue point position
+def update_plot(blue_x, blue_y):
+    volumes = [float(volume) for volume in volume_readouts(blue_x, blue_y)]
+    draw_frame(blue_x, blue_y, feasible_grid.update(blue_x, blue_y), volumes)
 
     # Redraw the plot
     fig.canvas.draw_idle()
 
-# Create the plot
-fig, ax = plt.subplots(figsize=(12, 11))
-plt.subplots_adjust(left=-.27, bottom=0.3)
 
 # Initial plot
 update_plot(initial_blue[0], initial_blue[1])
 
-# Define a function for a DVD-like bounce within the triangle
+# Define a DVD-like bounce within the triangle, with exact reflections at the walls
 class DVD_Bounce:
     def __init__(self, initial_position, velocity, triangle_vertices):
         self.position = np.array(initial_position, dtype='float')
         self.velocity = np.array(velocity, dtype='float') + np.random.uniform(-0.001, 0.001, size=2)
-        self.triangle = Polygon(triangle_vertices)
-        self.edges = [
-            (triangle_vertices[i], triangle_vertices[(i + 1) % len(triangle_vertices)])
-            for i in range(len(triangle_vertices))
-        ]
-
-    def step(self):
-        # Update position
-        self.position += self.velocity
-        point = Point(self.position)
-
-        # Check for collisions with triangle boundaries and bounce
-        if not self.triangle.contains(point):
-            for edge in self.edges:
-                p1, p2 = edge
-                edge_vector = np.array(p2) - np.array(p1)
-                edge_normal = np.array([-edge_vector[1], edge_vector[0]])
-                edge_normal = edge_normal / np.linalg.norm(edge_normal)
-
-                p1_to_pos = self.position - np.array(p1)
-                dist_to_edge = np.dot(p1_to_pos, edge_normal)
-
-                if dist_to_edge <= 0:
-                    self.velocity -= 2 * np.dot(self.velocity, edge_normal) * edge_normal
-                    break
-            # Add a small random perturbation to prevent loops
-            self.velocity += np.random.uniform(-0.000002, 0.000002, size=2)
-        return self.position
+        self.engine = PolygonBounce(triangle_vertices)
+
+    def trajectory(self, num_steps):
+        # Positions after each of num_steps steps of one velocity, with a small random
+        # perturbation at every bounce to prevent loops
+        return self.engine.trajectory(self.position, self.velocity, num_steps, jitter=0.000002)
 
 # Initialize DVD bounce within the triangle
 triangle_vertices = [(0, 0), (1, 0), (0.5, 0.5)]  # Vertices of the triangle
@@ -147,13 +110,35 @@ initial_velocity = [0.01, 0.015]
 dvd_bounce = DVD_Bounce(initial_position, initial_velocity, triangle_vertices)
 
 
-# Update function for animation
-def animate(i):
-    position = dvd_bounce.step()
-    update_plot(position[0], position[1])
+# Function to precompute every frame of the animation in a batch
+def precompute_frames(bounce, num_frames):
+    # Trajectory of the blue point
+    positions = bounce.trajectory(num_frames)
 
-# Create the animation
-ani = FuncAnimation(fig, animate, frames=800, interval=50, repeat=True)
+    # Volume readouts of all frames in one vectorized call
+    volumes = np.stack(volume_readouts(positions[:, 0], positions[:, 1]), axis=1)
 
-# Show plot
-plt.show()
+    # Feasible regions, bit-packed to keep 800 frames of 600x600 masks at about 36 MB
+    masks = np.empty((num_frames, (grid_resolution * grid_resolution + 7) // 8), dtype=np.uint8)
+    for i, (blue_x, blue_y) in enumerate(positions):
+        masks[i] = np.packbits(feasible_grid.update(blue_x, blue_y))
+    return positions, volumes, masks
+
+
+positions, volumes, masks = precompute_frames(dvd_bounce, num_frames)
+
+
+# Update function for animation
+def animate(i):
+    mask = np.unpackbits(masks[i], count=grid_resolution * grid_resolution).reshape(grid_resolution, grid_resolution)
+    return draw_frame(positions[i, 0], positions[i, 1], mask, volumes[i])
+
+# Create the animation, redrawing only the artists that change
+ani = FuncAnimation(fig, animate, frames=num_frames, interval=50, repeat=True, blit=True)
+
+# Export the animation or show the plot
+if save_path is not None:
+    writer = PillowWriter(fps=20) if save_path.endswith('.gif') else 'ffmpeg'
+    ani.save(save_path, writer=writer)
+else:
+    plt.show()
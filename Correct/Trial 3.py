@@ -1,134 +1,94 @@
-import numpy as np
+import os
 import time
+from functools import partial
+
+import numpy as np
+
+from adaptive import binomial_interval, iter_adaptive_estimates
+from parallel import iter_task_counts
+from reduced_precision import precision_hit_count
+from result_cache import ResultCache, code_version
 
 # Number of points to simulate
 num_points = 100_000_000
 num_iterations = 720  # Number of iterations for averaging
-
-# Initialize accumulators for probability and runtime
-total_probability = 0
-total_runtime = 0
-
-for i in range(num_iterations):
-    # Start the timer
-    start_time = time.time()
-
-    # Randomly generate two sets of points (blue and red) within [0, 1] x [0, 1]
-    blue = np.random.rand(num_points, 2)
-    red = np.random.rand(num_points, 2)
-
-    # Determine which boundary (x = 0, y = 0, x = 1, y = 1) blue is closest to
-    boundaries = np.stack([
-        blue[:, 0],           # Distance to x = 0
-        blue[:, 1],           # Distance to y = 0
-        1 - blue[:, 0],       # Distance to x = 1
-        1 - blue[:, 1]        # Distance to y = 1
-    ], axis=1)
-    closest_boundary_indices = np.argmin(boundaries, axis=1)
-
-    # Calculate midpoint of blue and red
-    mid_point = (blue + red) / 2
-
-    # Calculate the slope of the line connecting blue and red
-    delta_x = red[:, 0] - blue[:, 0]
-    delta_y = red[:, 1] - blue[:, 1]
-    slope = np.where(delta_x != 0, delta_y / delta_x, np.nan)
-
-    # Calculate the slope of the perpendicular bisector
-    perp_slope = np.where(np.isnan(slope), 0, np.where(slope == 0, np.nan, -1 / slope))
-
-    # Initialize an array to store the intersection results
-    intersection = np.zeros(num_points, dtype=bool)
-
-    # Process each boundary separately using vectorized operations
-
-    # Boundary x = 0
-    idx0 = closest_boundary_indices == 0
-    perp_slope0 = perp_slope[idx0]
-    mid_point0 = mid_point[idx0]
-
-    # y at x = 0
-    y_at_x0 = mid_point0[:, 1] - perp_slope0 * mid_point0[:, 0]
-    condition0 = np.where(
-        np.isnan(perp_slope0),
-        mid_point0[:, 0] == 0,
-        np.where(
-            perp_slope0 == 0,
-            (0 <= mid_point0[:, 1]) & (mid_point0[:, 1] <= 1),
-            (0 <= y_at_x0) & (y_at_x0 <= 1)
-        )
-    )
-    intersection[idx0] = condition0
-
-    # Boundary y = 0
-    idx1 = closest_boundary_indices == 1
-    perp_slope1 = perp_slope[idx1]
-    mid_point1 = mid_point[idx1]
-
-    # x at y = 0
-    x_at_y0 = mid_point1[:, 0] - mid_point1[:, 1] / perp_slope1
-    condition1 = np.where(
-        perp_slope1 == 0,
-        mid_point1[:, 1] == 0,
-        np.where(
-            np.isnan(perp_slope1),
-            (0 <= mid_point1[:, 0]) & (mid_point1[:, 0] <= 1),
-            (0 <= x_at_y0) & (x_at_y0 <= 1)
-        )
-    )
-    intersection[idx1] = condition1
-
-    # Boundary x = 1
-    idx2 = closest_boundary_indices == 2
-    perp_slope2 = perp_slope[idx2]
-    mid_point2 = mid_point[idx2]
-
-    # y at x = 1
-    y_at_x1 = perp_slope2 * (1 - mid_point2[:, 0]) + mid_point2[:, 1]
-    condition2 = np.where(
-        np.isnan(perp_slope2),
-        mid_point2[:, 0] == 1,
-        np.where(
-            perp_slope2 == 0,
-            (0 <= mid_point2[:, 1]) & (mid_point2[:, 1] <= 1),
-            (0 <= y_at_x1) & (y_at_x1 <= 1)
-        )
-    )
-    intersection[idx2] = condition2
-
-    # Boundary y = 1
-    idx3 = closest_boundary_indices == 3
-    perp_slope3 = perp_slope[idx3]
-    mid_point3 = mid_point[idx3]
-
-    # x at y = 1
-    x_at_y1 = mid_point3[:, 0] + (1 - mid_point3[:, 1]) / perp_slope3
-    condition3 = np.where(
-        perp_slope3 == 0,
-        mid_point3[:, 1] == 1,
-        np.where(
-            np.isnan(perp_slope3),
-            (0 <= mid_point3[:, 0]) & (mid_point3[:, 0] <= 1),
-            (0 <= x_at_y1) & (x_at_y1 <= 1)
-        )
-    )
-    intersection[idx3] = condition3
-
-    # Calculate the probability for this iteration
-    probability = np.sum(intersection) / num_points
-    total_probability += probability
-
-    # End the timer and calculate runtime
-    end_time = time.time()
-    runtime = end_time - start_time
-    total_runtime += runtime
-
-    print(f"Iteration {i + 1}: Probability = {probability:.6f}, Runtime = {runtime:.2f} seconds")
-
-# Calculate averages
-average_probability = total_probability / num_iterations
-average_runtime = total_runtime / num_iterations
-
-# Display final results
-print(f"\nAverage Probability over {num_iterations} iterations: {average_probability:.6f}")
-print(f"Average Runtime per iteration: {average_runtime:.2f} seconds")
+seed = None  # Root seed; set it to reproduce a run exactly, whatever the worker count
+workers = os.cpu_count()  # Iterations run concurrently, one per worker process
+
+# Sampling mode: 'float64', or 'float32' / 'fixed32' (with fixed_point_bits per coordinate) for
+# less memory traffic at some bias; run reduced_precision.py first, which reports the largest
+# run each mode suits (the full 720 x 1e8 pairs here exceed what it shows for either mode)
+precision = 'float64'
+fixed_point_bits = 16
+
+# Completed iterations are stored here as they finish, so re-running with the same seed (or
+# with more iterations) reuses them and an interrupted run resumes (None to disable); with
+# seed = None the fresh entropy of the first run is stored too and reused by later runs
+cache_path = 'results.sqlite'
+
+# Adaptive mode: instead of a fixed number of iterations, keep running iterations until the
+# confidence interval of the estimate is at most this half-width (None for the fixed run)
+target_half_width = None  # e.g. 1e-5
+confidence = 0.99
+
+if __name__ == "__main__":
+    # Every iteration draws from its own independent stream spawned from the root seed
+    cache = ResultCache(cache_path) if cache_path is not None else None
+    root_seed = cache.root_seed('Trial 3', seed) if cache is not None else np.random.SeedSequence(seed)
+    print(f"Root seed entropy: {root_seed.entropy}, Workers: {workers}")
+
+    # Both modes stream their points through the folded bisector test in the chosen precision
+    count_fn = partial(precision_hit_count, precision=precision, bits=fixed_point_bits)
+
+    if target_half_width is not None:
+        # Run iterations of num_points until the Wilson interval is narrow enough
+        start_time = time.time()
+        for hits, points, low, high in iter_adaptive_estimates(target_half_width, confidence, root_seed=root_seed,
+                                                               workers=workers, batch_size=num_points,
+                                                               count_fn=count_fn):
+            elapsed = time.time() - start_time
+            print(f"Points: {points}, Probability = {hits / points:.9f}, "
+                  f"{confidence:.0%} CI half-width = {(high - low) / 2:.2e}, Elapsed = {elapsed:.2f} seconds")
+        print(f"\nProbability: {hits / points:.9f}, {confidence:.0%} CI: [{low:.9f}, {high:.9f}] from {points} points")
+    else:
+        # Initialize accumulators for hits and runtime
+        total_hits = 0
+        start_time = time.time()
+
+        # Each iteration streams its points through the bisector test in chunks
+        task_sizes = [num_points] * num_iterations
+        cached = set()
+        if cache is not None:
+            key = ResultCache.key('Trial 3', {'kernel': 'folded_bottom_side_hits', 'bit_generator': 'PCG64',
+                                              'precision': precision, 'bits': fixed_point_bits},
+                                  root_seed, code_version('bisector_kernels', 'streaming', 'parallel',
+                                                          'reduced_precision'))
+            cached = {i for i, (size, _) in cache.task_counts(key).items() if size == num_points}
+            counts = cache.iter_task_counts(key, task_sizes, root_seed, workers, count_fn)
+        else:
+            counts = iter_task_counts(task_sizes, root_seed, workers, count_fn)
+        for i, hits in enumerate(counts):
+            # Calculate the probability for this iteration
+            probability = hits / num_points
+            total_hits += hits
+
+            if i in cached:
+                print(f"Iteration {i + 1}: Probability = {probability:.6f} (cached)")
+            else:
+                elapsed = time.time() - start_time
+                print(f"Iteration {i + 1}: Probability = {probability:.6f}, Elapsed = {elapsed:.2f} seconds")
+
+        # Calculate averages; only the iterations computed in this run were timed
+        total_runtime = time.time() - start_time
+        average_probability = total_hits / (num_points * num_iterations)
+        num_computed = num_iterations - len(cached & set(range(num_iterations)))
+
+        # Display final results
+        low, high = binomial_interval(total_hits, num_points * num_iterations, confidence)
+        print(f"\nAverage Probability over {num_iterations} iterations: {average_probability:.6f}")
+        print(f"{confidence:.0%} CI: [{low:.9f}, {high:.9f}]")
+        if num_computed:
+            print(f"Average Runtime per computed iteration: {total_runtime / num_computed:.2f} seconds "
+                  f"({num_iterations - num_computed} iterations from the cache)")
+        else:
+            print(f"All {num_iterations} iterations from the cache")
@@ -0,0 +1,99 @@
+import itertools
+import math
+from statistics import NormalDist
+
+import numpy as np
+
+from parallel import DEFAULT_TASK_SIZE, iter_task_counts
+
+
+def binomial_interval(hits, num_points, confidence=0.99, method='wilson'):
+    """
+    Confidence interval for a probability estimated as hits / num_points.
+
+    Parameters:
+        hits (int): The number of hits.
+        num_points (int): The number of independent trials.
+        confidence (float): The confidence level of the interval.
+        method (str): 'wilson' for the Wilson score interval, 'normal' for the
+                      normal-approximation (Wald) interval.
+
+    Returns:
+        tuple of float: The lower and upper bounds of the interval.
+    """
+    z = NormalDist().inv_cdf(0.5 + confidence / 2)
+    p = hits / num_points
+    if method == 'normal':
+        half_width = z * math.sqrt(p * (1 - p) / num_points)
+        return p - half_width, p + half_width
+    if method != 'wilson':
+        raise ValueError(f"Unknown interval method: {method!r}")
+
+    # Wilson score interval, well behaved even when p is near 0 or 1
+    scale = 1 + z * z / num_points
+    centre = (p + z * z / (2 * num_points)) / scale
+    half_width = z / scale * math.sqrt(p * (1 - p) / num_points + z * z / (4 * num_points * num_points))
+    return centre - half_width, centre + half_width
+
+
+def iter_adaptive_estimates(target_half_width, confidence=0.99, method='wilson', root_seed=None, workers=None,
+                            batch_size=DEFAULT_TASK_SIZE, max_points=None, count_fn=None,
+                            bit_generator=np.random.PCG64):
+    """
+    Run batches of the estimator until the confidence interval is narrow enough.
+
+    Batches run on a single process pool that is kept fed for the whole
+    run, but the stopping rule is checked after every batch in batch order
+    and batches completed past the stopping point are discarded, so the
+    result depends only on the root seed and the batch size, never on the
+    number of workers.
+
+    Parameters:
+        target_half_width (float): Stop once the interval half-width is at most this.
+        confidence (float): The confidence level of the interval.
+        method (str): The interval method ('wilson' or 'normal', see binomial_interval).
+        root_seed (int, SeedSequence or None): The root seed of the run.
+        workers (int): The number of worker processes (os.cpu_count() if None).
+        batch_size (int): The number of pairs per batch.
+        max_points (int): Stop after this many pairs even if the target is not met (None for no limit).
+        count_fn (callable): Picklable count_fn(num_points, rng) returning a hit count
+            (the chunked folded kernel if None).
+        bit_generator (type): The bit generator class seeded with each batch's SeedSequence.
+
+    Yields:
+        tuple: The running hits, number of pairs and interval bounds after each batch.
+    """
+    if not isinstance(root_seed, np.random.SeedSequence):
+        root_seed = np.random.SeedSequence(root_seed)
+
+    total_hits = 0
+    total_points = 0
+    counts = iter_task_counts(itertools.repeat(batch_size), root_seed, workers, count_fn, bit_generator)
+    for hits in counts:
+        total_hits += hits
+        total_points += batch_size
+        low, high = binomial_interval(total_hits, total_points, confidence, method)
+        yield total_hits, total_points, low, high
+
+        if (high - low) / 2 <= target_half_width or (max_points is not None and total_points >= max_points):
+            counts.close()
+            return
+
+
+def adaptive_estimate(target_half_width, confidence=0.99, method='wilson', root_seed=None, workers=None,
+                      batch_size=DEFAULT_TASK_SIZE, max_points=None, count_fn=None,
+                      bit_generator=np.random.PCG64):
+    """
+    Estimate the probability to a target confidence-interval half-width.
+
+    Parameters:
+        See iter_adaptive_estimates.
+
+    Returns:
+        tuple: The estimate, the interval bounds and the number of pairs used.
+    """
+    for hits, num_points, low, high in iter_adaptive_estimates(target_half_width, confidence, method, root_seed,
+                                                               workers, batch_size, max_points, count_fn,
+                                                               bit_generator):
+        pass
+    return hits / num_points, low, high, num_points
@@ -0,0 +1,84 @@
+import json
+from concurrent.futures import ProcessPoolExecutor
+
+from estimators import BACKENDS, estimate
+from generator_harness import peak_rss
+
+# Samples per backend for each benchmark run, and the standard error the
+# wall-time column is extrapolated to
+num_points = 4_000_000
+target_standard_error = 1e-6
+seed = 12345
+
+# Write the results here as JSON to track them across versions (None to only print)
+output_path = None
+
+
+def run_benchmark(backend, n, seed):
+    """
+    Benchmark one backend in the current process.
+
+    A small warm-up run comes first, so one-off costs such as numba
+    compilation are not timed.
+
+    Parameters:
+        backend (str): The name of the backend in estimators.BACKENDS.
+        n (int): The number of samples of the timed run.
+        seed (int): The seed of the timed run.
+
+    Returns:
+        dict: The estimate, its standard error, samples/s, the wall time
+              extrapolated to target_standard_error and the peak RSS in bytes.
+    """
+    estimate(min(n, 10_000), seed, backend)
+    result = estimate(n, seed, backend)
+
+    # Monte Carlo errors shrink as 1 / sqrt(samples), so time scales with the squared error ratio;
+    # the deterministic integrals either reach the target or do not
+    if result.num_points:
+        samples_per_second = result.num_points / result.seconds
+        time_to_target = result.seconds * (result.standard_error / target_standard_error) ** 2
+    else:
+        samples_per_second = None
+        time_to_target = result.seconds if result.standard_error <= target_standard_error else None
+
+    return {'backend': backend, 'value': result.value, 'standard_error': result.standard_error,
+            'num_points': result.num_points, 'seconds': result.seconds,
+            'samples_per_second': samples_per_second, 'time_to_target': time_to_target, 'peak_rss': peak_rss()}
+
+
+def run_benchmarks(backends, n, seed):
+    """
+    Benchmark every backend, each in a fresh process so its peak memory is its own.
+
+    Parameters:
+        backends (list of str): The names of the backends.
+        n (int): The number of samples per backend.
+        seed (int): The seed of every run.
+
+    Yields:
+        dict: The result of each backend (see run_benchmark), in order.
+    """
+    with ProcessPoolExecutor(max_workers=1, max_tasks_per_child=1) as pool:
+        yield from pool.map(run_benchmark, backends, [n] * len(backends), [seed] * len(backends))
+
+
+def _format(value, spec, missing='-'):
+    return format(value, spec) if value is not None else missing
+
+
+if __name__ == "__main__":
+    results = []
+    print(f"{'Backend':<18}{'Estimate':>20}{'Std error':>11}{'Samples/s':>11}"
+          f"{f'Time to {target_standard_error:.0e}':>15}{'Peak RSS':>11}")
+    for result in run_benchmarks(list(BACKENDS), num_points, seed):
+        results.append(result)
+        peak = _format(result['peak_rss'] and result['peak_rss'] / 2**20, '.0f')
+        print(f"{result['backend']:<18}{result['value']:>20.15f}{result['standard_error']:>11.1e}"
+              f"{_format(result['samples_per_second'], '.2e'):>11}"
+              f"{_format(result['time_to_target'], '.3g'):>13} s{peak:>7} MiB")
+
+    if output_path is not None:
+        with open(output_path, 'w') as output:
+            json.dump({'num_points': num_points, 'target_standard_error': target_standard_error,
+                       'results': results}, output, indent=2)
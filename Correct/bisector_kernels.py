@@ -0,0 +1,187 @@
+import numpy as np
+
+# Default number of blue/red pairs processed per chunk by the streaming estimators,
+# small enough for the working set of a kernel to stay in cache
+DEFAULT_CHUNK_SIZE = 65_536
+
+
+class ChunkBuffers:
+    """
+    Preallocated scratch arrays shared by every chunk of a streaming run.
+
+    The random number generator fills the coordinate rows in place and the
+    kernels only ever write into the work arrays, so a run of any length keeps
+    touching the same O(chunk_size) block of memory. The kernels compute in
+    the dtype of the buffers and leave the indicator of every pair in
+    masks[0]. With float32 buffers each pass moves half the memory and twice
+    as many pairs fit in a SIMD register, at the cost of a small bias that
+    reduced_precision.py measures.
+
+    Parameters:
+        chunk_size (int): The number of blue/red pairs held per chunk.
+        dtype (type): The floating-point type of the coordinates and work arrays.
+    """
+
+    def __init__(self, chunk_size=DEFAULT_CHUNK_SIZE, dtype=np.float64):
+        self.chunk_size = chunk_size
+        self.coords = np.empty((4, chunk_size), dtype=dtype)  # Rows: blue x, blue y, red x, red y
+        self.work = np.empty((3, chunk_size), dtype=dtype)
+        self.side = np.empty(chunk_size, dtype=np.int8)
+        self.masks = np.empty((2, chunk_size), dtype=bool)
+
+    def fill(self, rng, n):
+        """
+        Draw n fresh blue and red points into the coordinate rows.
+
+        Parameters:
+            rng (np.random.Generator): The generator to draw from.
+            n (int): The number of pairs to draw (at most chunk_size).
+        """
+        for row in self.coords[:, :n]:
+            rng.random(out=row, dtype=row.dtype)
+
+
+def closest_side_hits(buffers, n):
+    """
+    Count the pairs whose perpendicular bisector crosses the side of the unit
+    square closest to the blue point.
+
+    This is the test from Trial 3.py evaluated entirely inside the chunk
+    buffers: instead of four masked passes, every blue/red pair is swapped
+    across the diagonal y = x when its closest side is horizontal, so a single
+    formula gives where the bisector crosses the line of the closest side.
+    The coordinate rows are overwritten.
+
+    Parameters:
+        buffers (ChunkBuffers): Buffers holding the pairs in their first n columns.
+        n (int): The number of pairs to evaluate.
+
+    Returns:
+        int: The number of pairs whose bisector crosses the closest side.
+    """
+    bx, by, rx, ry = buffers.coords[:, :n]
+    best, along, tmp = buffers.work[:, :n]
+    side = buffers.side[:n]
+    mask, in_range = buffers.masks[:, :n]
+
+    # Closest boundary in the order of Trial 3.py (x = 0, y = 0, x = 1, y = 1),
+    # keeping the first one on ties like np.argmin
+    np.copyto(best, bx)
+    side.fill(0)
+    for index in range(1, 4):
+        if index == 1:
+            distance = by
+        else:
+            distance = np.subtract(1, bx if index == 2 else by, out=tmp)
+        np.less(distance, best, out=mask)
+        np.copyto(best, distance, where=mask)
+        np.copyto(side, index, where=mask)
+
+    # Coordinate c of the closest side along its normal (0 for x = 0 / y = 0, 1 otherwise)
+    np.greater_equal(side, 2, out=mask)
+    np.copyto(best, mask)
+
+    # Swap x and y for the horizontal sides so the closest side is always the line x = c
+    np.bitwise_and(side, 1, out=side)
+    np.copyto(mask, side, casting='unsafe')
+    for u, v in ((bx, by), (rx, ry)):
+        np.copyto(tmp, u)
+        np.copyto(u, v, where=mask)
+        np.copyto(v, tmp, where=mask)
+
+    # The bisector crosses x = c at y = My - (c - Mx) * Dx / Dy; a bisector parallel
+    # to the side gives +-inf or NaN here and is correctly rejected below
+    with np.errstate(divide='ignore', invalid='ignore'):
+        np.add(bx, rx, out=tmp)
+        tmp *= 0.5
+        np.subtract(best, tmp, out=best)
+        np.subtract(rx, bx, out=tmp)
+        best *= tmp
+        np.subtract(ry, by, out=tmp)
+        np.divide(best, tmp, out=best)
+        np.add(by, ry, out=along)
+        along *= 0.5
+        along -= best
+
+    # Check whether the crossing lies on the side itself
+    np.greater_equal(along, 0, out=mask)
+    np.less_equal(along, 1, out=in_range)
+    mask &= in_range
+    return int(np.count_nonzero(mask))
+
+
+
+def folded_bottom_side_hits(buffers, n):
+    """
+    Count the pairs whose perpendicular bisector crosses the side of the unit
+    square closest to the blue point, using the symmetry of the square.
+
+    With f(P) = |P - B|^2 - |P - R|^2, the bisector crosses a side exactly when
+    f does not keep one sign at the two corners of that side. In coordinates
+    centred on (1/2, 1/2) f is h + (R - B) . 2P with h = |B|^2 - |R|^2, which
+    the reflections of the square leave unchanged. Every pair is folded by
+    the same reflections (across x = 1/2, y = 1/2 and y = 1 - x) until blue
+    lies in the triangle y <= x, y <= 1 - x used in JaneStreet_Puzz.py, whose
+    closest side is y = 0, so one branch-free comparison |h - Dy| <= |Dx|
+    decides every pair: no division, NaN handling or per-side indexing.
+    The reflections only flip the signs of (Dx, Dy) or swap them, so they
+    are applied to the direction alone. The count matches closest_side_hits
+    except on ties where blue lies on a diagonal of the square, equally close
+    to two sides: the fold then tests the side it maps to y = 0, while
+    closest_side_hits keeps the first in its order, so the two can differ on
+    these pairs (of probability 0 for continuous draws). The coordinate rows
+    are overwritten.
+
+    Parameters:
+        buffers (ChunkBuffers): Buffers holding the pairs in their first n columns.
+        n (int): The number of pairs to evaluate.
+
+    Returns:
+        int: The number of pairs whose bisector crosses the closest side.
+    """
+    bx, by, rx, ry = buffers.coords[:, :n]
+    dx, dy = buffers.work[:2, :n]
+    mask = buffers.masks[0, :n]
+
+    # Centre the square on the origin
+    for coord in (bx, by, rx, ry):
+        coord -= 0.5
+
+    # D = R - B and -h = (R - B) . (R + B), kept in rx
+    np.subtract(rx, bx, out=dx)
+    np.subtract(ry, by, out=dy)
+    rx += bx
+    rx *= dx
+    ry += by
+    ry *= dy
+    rx += ry
+
+    # Reflect across x = 1/2 where blue lies left of it and across y = 1/2 where it
+    # lies above it; only the sign of f matters, so the direction is flipped with
+    # blue, and blue exactly on one of these lines is left as it is
+    np.less(bx, 0, out=mask)
+    np.multiply(mask, -2, out=ry)
+    ry += 1
+    dx *= ry
+    np.greater(by, 0, out=mask)
+    np.multiply(mask, -2, out=ry)
+    ry += 1
+    dy *= ry
+
+    # Reflect across y = 1 - x, (Dx, Dy) -> (-Dy, -Dx), wherever blue is now closer
+    # to x = 1 than to y = 0
+    np.abs(bx, out=bx)
+    np.abs(by, out=by)
+    np.greater(bx, by, out=mask)
+    np.add(dx, dy, out=ry)
+    ry *= mask
+    dx -= ry
+    dy -= ry
+
+    # f is h -+ Dx - Dy at the corners of y = 0, so the bisector crosses it
+    # between them when |h - Dy| <= |Dx|
+    rx += dy
+    np.abs(rx, out=rx)
+    np.abs(dx, out=dx)
+    np.less_equal(rx, dx, out=mask)
+    return int(np.count_nonzero(mask))
@@ -0,0 +1,181 @@
+import numpy as np
+
+from bisector_kernels import DEFAULT_CHUNK_SIZE
+
+
+def _clipped_arc_integral(radius, lo, hi):
+    """
+    Integrate min(1, sqrt(radius^2 - u^2)) over lo <= u <= hi, elementwise.
+
+    This is the area inside the unit square under a circle centred on the
+    square's bottom side, between two distances lo and hi from the centre
+    measured along that side. Limits past the circle are clipped and empty
+    intervals give 0.
+
+    Parameters:
+        radius (np.ndarray): The circle radii.
+        lo (np.ndarray): The lower limits, at least 0.
+        hi (np.ndarray): The upper limits.
+
+    Returns:
+        np.ndarray: The clipped areas.
+    """
+    hi = np.maximum(np.minimum(hi, radius), lo)
+
+    # Below u = flat the circle is higher than the square, so the height is 1
+    flat = np.sqrt(np.maximum(radius**2 - 1, 0))
+    flat_part = np.clip(flat, lo, hi) - lo
+
+    # Above it the height follows the arc: F(u) = (u sqrt(r^2 - u^2) + r^2 asin(u / r)) / 2
+    def arc_antiderivative(u):
+        height = np.sqrt(np.maximum(radius**2 - u**2, 0))
+        return (u * height + radius**2 * np.arctan2(u, height)) / 2
+
+    arc_start = np.clip(flat, lo, hi)
+    return flat_part + arc_antiderivative(hi) - arc_antiderivative(arc_start)
+
+
+def circle_square_areas(blue_x, blue_y):
+    """
+    Exact areas inside the unit square of the two circles through the blue
+    point centred at (0, 0) and (1, 0), and of their overlap.
+
+    These are the volume_1, volume_2 and overlap_volume that Anime.py and
+    Visualize redpoint conditions.py measure with shapely polygons.
+
+    Parameters:
+        blue_x (np.ndarray): The x coordinates of the blue points.
+        blue_y (np.ndarray): The y coordinates of the blue points.
+
+    Returns:
+        tuple of np.ndarray: The areas of circle 1, circle 2 and their overlap.
+    """
+    blue_x = np.asarray(blue_x, dtype=float)
+    blue_y = np.asarray(blue_y, dtype=float)
+    radius_1 = np.hypot(blue_x, blue_y)
+    radius_2 = np.hypot(1 - blue_x, blue_y)
+
+    # Circle 2 is measured along u = 1 - x, from its own centre
+    zero = np.zeros_like(radius_1)
+    area_1 = _clipped_arc_integral(radius_1, zero, 1)
+    area_2 = _clipped_arc_integral(radius_2, zero, 1)
+
+    # Both circles pass through blue and its mirror image below y = 0, so the
+    # overlap is bounded by circle 2 left of x = blue_x and by circle 1 right of it
+    overlap = (_clipped_arc_integral(radius_1, np.maximum(blue_x, 0), 1)
+               + _clipped_arc_integral(radius_2, np.maximum(1 - blue_x, 0), 1))
+    return area_1, area_2, overlap
+
+
+def feasible_area(blue_x, blue_y):
+    """
+    Probability, for fixed blue points, that a uniform red point makes the
+    perpendicular bisector cross the bottom side of the unit square.
+
+    The bisector crosses y = 0 between x = 0 and x = 1 exactly when red lies in
+    one of the circles of circle_square_areas but not the other, so the
+    probability is the area of their symmetric difference inside the square.
+
+    Parameters:
+        blue_x (np.ndarray): The x coordinates of the blue points.
+        blue_y (np.ndarray): The y coordinates of the blue points.
+
+    Returns:
+        np.ndarray: The feasible area for each blue point.
+    """
+    area_1, area_2, overlap = circle_square_areas(blue_x, blue_y)
+    return area_1 + area_2 - 2 * overlap
+
+
+def volume_readouts(blue_x, blue_y):
+    """
+    The volume readouts shown by Anime.py for any number of blue positions.
+
+    One call with the whole trajectory computes every frame's readout at once.
+
+    Parameters:
+        blue_x (np.ndarray): The x coordinates of the blue points.
+        blue_y (np.ndarray): The y coordinates of the blue points.
+
+    Returns:
+        tuple of np.ndarray: volume_1, volume_2, overlap_volume and total_volume.
+    """
+    volume_1, volume_2, overlap_volume = circle_square_areas(blue_x, blue_y)
+    total_volume = np.maximum(volume_1 - overlap_volume, 0) + np.maximum(volume_2 - overlap_volume, 0)
+    return volume_1, volume_2, overlap_volume, total_volume
+
+
+def shapely_circle_square_areas(blue_x, blue_y, quad_segs=16):
+    """
+    The shapely computation of circle_square_areas used in Anime.py, kept to
+    cross-check the exact formulas.
+
+    Parameters:
+        blue_x (np.ndarray): The x coordinates of the blue points.
+        blue_y (np.ndarray): The y coordinates of the blue points.
+        quad_segs (int): Polygon segments per quarter circle (16 in Anime.py).
+
+    Returns:
+        tuple of np.ndarray: The areas of circle 1, circle 2 and their overlap.
+    """
+    from shapely.geometry import Point
+    from shapely.geometry.polygon import Polygon
+
+    unit_square = Polygon([(0, 0), (1, 0), (1, 1), (0, 1)])
+    areas = []
+    for bx, by in zip(np.ravel(blue_x), np.ravel(blue_y)):
+        circle_1 = Point(0, 0).buffer(np.hypot(bx, by), quad_segs=quad_segs)
+        circle_2 = Point(1, 0).buffer(np.hypot(1 - bx, by), quad_segs=quad_segs)
+        areas.append((circle_1.intersection(unit_square).area,
+                      circle_2.intersection(unit_square).area,
+                      circle_1.intersection(circle_2).intersection(unit_square).area))
+    return tuple(np.array(column) for column in zip(*areas))
+
+
+def estimate_probability_conditional(num_points, rng=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Estimate the bisector probability as the mean feasible area over blue.
+
+    Red is integrated out exactly by feasible_area, leaving a 2-D expectation
+    over blue points folded into the triangle 0 <= y <= x <= 1/2, which is
+    enough by the symmetry of the square.
+
+    Parameters:
+        num_points (int): The number of blue points to average over.
+        rng (np.random.Generator): The generator to draw from (a fresh default one if None).
+        chunk_size (int): The number of blue points per chunk.
+
+    Returns:
+        tuple: The estimated probability and its standard error.
+    """
+    if rng is None:
+        rng = np.random.default_rng()
+
+    total = 0.0
+    total_sq = 0.0
+    for start in range(0, num_points, chunk_size):
+        n = min(chunk_size, num_points - start)
+        x, y = rng.random((2, n))
+        x = np.minimum(x, 1 - x)
+        y = np.minimum(y, 1 - y)
+        area = feasible_area(np.maximum(x, y), np.minimum(x, y))
+        total += area.sum()
+        total_sq += (area**2).sum()
+
+    mean = total / num_points
+    variance = max(total_sq / num_points - mean**2, 0) * num_points / max(num_points - 1, 1)
+    return mean, np.sqrt(variance / num_points)
+
+
+if __name__ == "__main__":
+    # Cross-check the exact areas against shapely on random blue points
+    rng = np.random.default_rng()
+    blue_x, blue_y = rng.random((2, 200))
+    exact = circle_square_areas(blue_x, blue_y)
+    for quad_segs in (16, 1024):
+        polygons = shapely_circle_square_areas(blue_x, blue_y, quad_segs)
+        error = max(np.max(np.abs(e - p)) for e, p in zip(exact, polygons))
+        print(f"Max difference from shapely with {quad_segs} segments per quarter circle: {error:.3e}")
+
+    probability, standard_error = estimate_probability_conditional(10_000_000, rng)
+    print(f"Estimated Probability: {probability:.9f} +/- {standard_error:.1e}")
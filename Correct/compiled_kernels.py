@@ -0,0 +1,133 @@
+import numpy as np
+
+from bisector_kernels import DEFAULT_CHUNK_SIZE, ChunkBuffers, folded_bottom_side_hits
+
+# numba is optional: without it the same counts come from a chunked NumPy fallback
+try:
+    import numba
+except ImportError:
+    numba = None
+
+HAVE_NUMBA = numba is not None
+
+# SplitMix64 constants. Uniform number j of a run is the SplitMix64 output for
+# state key + (j + 1) * _GAMMA, so any sample can be generated independently
+# of the others, in any order and on any thread.
+_GAMMA = np.uint64(0x9E3779B97F4A7C15)
+_MIX_1 = np.uint64(0xBF58476D1CE4E5B9)
+_MIX_2 = np.uint64(0x94D049BB133111EB)
+_TO_UNIT = 2.0 ** -53
+
+
+def _splitmix64_uniform(key, counter):
+    z = key + (counter + np.uint64(1)) * _GAMMA
+    z = (z ^ (z >> np.uint64(30))) * _MIX_1
+    z = (z ^ (z >> np.uint64(27))) * _MIX_2
+    z = z ^ (z >> np.uint64(31))
+    return (z >> np.uint64(11)) * _TO_UNIT
+
+
+def _folded_hit(bx, by, rx, ry):
+    # Scalar form of bisector_kernels.folded_bottom_side_hits
+    bx -= 0.5
+    by -= 0.5
+    rx -= 0.5
+    ry -= 0.5
+    dx = rx - bx
+    dy = ry - by
+    minus_h = dx * (rx + bx) + dy * (ry + by)
+    if bx < 0:
+        dx = -dx
+    if by > 0:
+        dy = -dy
+    if abs(bx) > abs(by):
+        dx, dy = -dy, -dx
+    return abs(minus_h + dy) <= abs(dx)
+
+
+if HAVE_NUMBA:
+    _splitmix64_uniform = numba.njit(inline='always')(_splitmix64_uniform)
+    _folded_hit = numba.njit(inline='always')(_folded_hit)
+
+    @numba.njit(parallel=True, cache=True)
+    def _count_hits_numba(num_points, key, start):
+        # Generates, tests and counts each pair in registers, so nothing but
+        # the per-thread hit counts is ever written to memory
+        hits = 0
+        for i in numba.prange(num_points):
+            counter = np.uint64(4) * np.uint64(start + i)
+            bx = _splitmix64_uniform(key, counter)
+            by = _splitmix64_uniform(key, counter + np.uint64(1))
+            rx = _splitmix64_uniform(key, counter + np.uint64(2))
+            ry = _splitmix64_uniform(key, counter + np.uint64(3))
+            if _folded_hit(bx, by, rx, ry):
+                hits += 1
+        return hits
+
+
+class _CounterBuffers(ChunkBuffers):
+    # Chunk buffers plus the two uint64 rows the NumPy SplitMix64 fallback needs
+    def __init__(self, chunk_size=DEFAULT_CHUNK_SIZE):
+        super().__init__(chunk_size)
+        self.state = np.empty((2, 4 * chunk_size), dtype=np.uint64)
+        self.counters = np.arange(1, 4 * chunk_size + 1, dtype=np.uint64)
+
+    def fill_counter(self, key, start, n):
+        z, tmp = self.state[:, :4 * n]
+        np.add(self.counters[:4 * n], np.uint64(4 * start), out=z)
+        z *= _GAMMA
+        z += key
+        for shift, mix in ((30, _MIX_1), (27, _MIX_2)):
+            np.right_shift(z, shift, out=tmp)
+            z ^= tmp
+            z *= mix
+        np.right_shift(z, 31, out=tmp)
+        z ^= tmp
+        z >>= np.uint64(11)
+        # Counter 4 * i + k holds coordinate k of pair i
+        np.multiply(z.reshape(n, 4).T, _TO_UNIT, out=self.coords[:, :n])
+
+
+def _count_hits_numpy(num_points, key, start, chunk_size=DEFAULT_CHUNK_SIZE):
+    buffers = _CounterBuffers(max(1, min(chunk_size, num_points)))
+    hits = 0
+    for offset in range(0, num_points, buffers.chunk_size):
+        n = min(buffers.chunk_size, num_points - offset)
+        buffers.fill_counter(key, start + offset, n)
+        hits += folded_bottom_side_hits(buffers, n)
+    return hits
+
+
+def compiled_hit_count(num_points, rng=None, start=0, backend=None):
+    """
+    Count bisector hits over num_points pairs in a single fused pass.
+
+    The numba backend generates the four coordinates of every pair with a
+    counter-based SplitMix64 stream, applies the folded closest-side test and
+    counts the hits in one multithreaded prange loop, so it allocates no
+    per-sample arrays at all. The NumPy fallback draws the identical stream
+    in chunks and runs folded_bottom_side_hits on it, so both backends return
+    the same count for the same key; the numba one is simply faster.
+
+    Parameters:
+        num_points (int): The total number of pairs to simulate.
+        rng (np.random.Generator): Generator supplying the 64-bit stream key (fresh if None).
+        start (int): Index of the first pair, to continue an earlier run with the same key.
+        backend (str): "numba", "numpy" or None to use numba when it is installed.
+
+    Returns:
+        int: The number of pairs whose bisector crosses the closest side.
+    """
+    if rng is None:
+        rng = np.random.default_rng()
+    if backend is None:
+        backend = "numba" if HAVE_NUMBA else "numpy"
+    key = rng.integers(0, 2**64, dtype=np.uint64)
+
+    if backend == "numba":
+        if not HAVE_NUMBA:
+            raise ImportError("The numba backend needs the numba package")
+        return int(_count_hits_numba(num_points, key, start))
+    if backend == "numpy":
+        return _count_hits_numpy(num_points, key, start)
+    raise ValueError(f"Unknown backend: {backend}")
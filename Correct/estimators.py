@@ -0,0 +1,148 @@
+import math
+import time
+from collections import namedtuple
+
+import numpy as np
+
+from bisector_kernels import DEFAULT_CHUNK_SIZE, closest_side_hits, folded_bottom_side_hits
+from circle_areas import estimate_probability_conditional, feasible_area
+from compiled_kernels import compiled_hit_count
+from cubature import adaptive_integrate_triangle, integrate_triangle
+from generator_harness import stream_generator
+from integer_kernels import DEFAULT_LATTICE_BITS, lattice_hit_count
+from parallel import DEFAULT_TASK_SIZE, parallel_hit_count
+from qmc import rqmc_estimate
+from reduced_precision import DEFAULT_FIXED_POINT_BITS, precision_hit_count
+from rng_registry import GENERATORS
+from variance_reduction import antithetic_estimate, control_variate_estimate, stratified_estimate
+
+# Result of one estimate: the probability, its standard error (or error estimate for the
+# deterministic integrals), the number of samples actually used, the wall time and the backend
+Estimate = namedtuple('Estimate', ['value', 'standard_error', 'num_points', 'seconds', 'backend'])
+
+
+def _binomial_error(hits, num_points):
+    p = hits / num_points
+    return p, math.sqrt(p * (1 - p) / num_points), num_points
+
+
+# Every backend maps (n, seed, **options) to (estimate, standard error, samples used)
+
+def _closest_side(n, seed, chunk_size=DEFAULT_CHUNK_SIZE, precision='float64', bits=DEFAULT_FIXED_POINT_BITS):
+    # Trial 3.py's four-sided closest-side test, streamed in chunks
+    hits = precision_hit_count(n, np.random.default_rng(seed), precision, chunk_size, closest_side_hits, bits)
+    return _binomial_error(hits, n)
+
+
+def _folded(n, seed, chunk_size=DEFAULT_CHUNK_SIZE, precision='float64', bits=DEFAULT_FIXED_POINT_BITS):
+    # The same test folded onto the bottom side, streamed in chunks
+    hits = precision_hit_count(n, np.random.default_rng(seed), precision, chunk_size, folded_bottom_side_hits, bits)
+    return _binomial_error(hits, n)
+
+
+def _lattice(n, seed, bits=DEFAULT_LATTICE_BITS, chunk_size=DEFAULT_CHUNK_SIZE):
+    # The folded test decided exactly in integers on a 2**bits lattice
+    return _binomial_error(lattice_hit_count(n, np.random.default_rng(seed), bits, chunk_size), n)
+
+
+def _parallel(n, seed, workers=None, task_size=DEFAULT_TASK_SIZE):
+    # The folded test split into tasks across a process pool
+    return _binomial_error(parallel_hit_count(n, seed, workers, task_size), n)
+
+
+def _compiled(n, seed, compiled_backend=None):
+    # The fused numba kernel (or its NumPy fallback)
+    return _binomial_error(compiled_hit_count(n, np.random.default_rng(seed), backend=compiled_backend), n)
+
+
+def _generator(n, seed, generator='PCG64', chunk_size=DEFAULT_CHUNK_SIZE):
+    # JaneStreet_Puzz.py's bounded-triangle sampling from one registered generator
+    result = stream_generator(generator, GENERATORS[generator][1], np.random.SeedSequence(seed), n, chunk_size)
+    return _binomial_error(result.hits, n)
+
+
+def _conditional(n, seed, chunk_size=DEFAULT_CHUNK_SIZE):
+    # Red integrated out exactly, averaging the feasible area over blue
+    value, standard_error = estimate_probability_conditional(n, np.random.default_rng(seed), chunk_size)
+    return value, standard_error, n
+
+
+def _rqmc(n, seed, num_replicates=16, workers=1):
+    # Scrambled Sobol' replicates of the largest power of 2 that fits in n
+    m = max(int(math.log2(max(n // num_replicates, 1))), 0)
+    value, standard_error, _ = rqmc_estimate(m, num_replicates, seed, workers)
+    return value, standard_error, num_replicates * 2**m
+
+
+def _variance_reduction(strategy):
+    def backend(n, seed, **options):
+        # Report the bisector tests the strategy actually drew, not the budget asked for
+        value, standard_error, _, num_tests = strategy(n, np.random.default_rng(seed), **options)
+        return value, standard_error, num_tests
+    return backend
+
+
+def _cubature(n, seed, rule='gauss-legendre', nodes=None):
+    # 8 times the integral of the exact feasible area over the triangle 0 <= y <= x <= 1/2;
+    # n and seed play no part in the deterministic integrals
+    value, error = integrate_triangle(lambda y, x: feasible_area(x, y), x_max=0.5, rule=rule, n=nodes)
+    return 8 * value, 8 * error, 0
+
+
+def _adaptive_cubature(n, seed, tol=1e-14):
+    value, error = adaptive_integrate_triangle(lambda y, x: feasible_area(x, y), x_max=0.5, tol=tol)
+    return 8 * value, 8 * error, 0
+
+
+# Backends by name
+BACKENDS = {
+    'closest_side': _closest_side,
+    'folded': _folded,
+    'lattice': _lattice,
+    'parallel': _parallel,
+    'compiled': _compiled,
+    'generator': _generator,
+    'conditional': _conditional,
+    'rqmc': _rqmc,
+    'stratified': _variance_reduction(stratified_estimate),
+    'antithetic': _variance_reduction(antithetic_estimate),
+    'control_variate': _variance_reduction(control_variate_estimate),
+    'cubature': _cubature,
+    'adaptive_cubature': _adaptive_cubature,
+}
+
+
+def estimate(n, seed=None, backend='folded', **options):
+    """
+    Estimate the probability that the perpendicular bisector of a random
+    blue/red pair crosses the side of the unit square closest to blue.
+
+    Every method of the project is available as a backend:
+
+    - 'closest_side', 'folded', 'parallel', 'compiled': plain Monte Carlo
+      with the kernels of bisector_kernels.py, streamed, across a process
+      pool or fused with numba ('closest_side' and 'folded' also in float32
+      or fixed point, options precision and bits);
+    - 'lattice': the exact integer kernel of integer_kernels.py;
+    - 'generator': the bounded-triangle sampling of JaneStreet_Puzz.py with
+      any generator of rng_registry (option generator);
+    - 'conditional', 'rqmc', 'stratified', 'antithetic', 'control_variate':
+      the variance-reduced estimators;
+    - 'cubature', 'adaptive_cubature': the deterministic integrals of New
+      Integral attempt.py and Integral Solution.py, for which n and seed
+      are ignored.
+
+    Parameters:
+        n (int): The number of samples (blue/red pairs, blue points or Sobol' points).
+        seed (int, SeedSequence or None): The seed (fresh entropy if None).
+        backend (str): The name of the method.
+        **options: Passed on to the backend (e.g. workers, chunk_size, generator).
+
+    Returns:
+        Estimate: The estimate, its standard error, the samples used, the wall time and the backend.
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown backend: {backend!r}")
+    start_time = time.perf_counter()
+    value, standard_error, num_points = BACKENDS[backend](n, seed, **options)
+    return Estimate(float(value), float(standard_error), num_points, time.perf_counter() - start_time, backend)
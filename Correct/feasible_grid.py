@@ -0,0 +1,51 @@
+import numpy as np
+
+
+class FeasibleGrid:
+    """
+    Grid of red points and the feasible region of a blue point on it.
+
+    A red point R makes the perpendicular bisector cross y = 0 between x = 0
+    and x = 1 exactly when it lies inside one of the circles through blue B
+    centred at (0, 0) and (1, 0) and outside the other, i.e. when
+    (|R|^2 - |B|^2) * (|R - (1, 0)|^2 - |B - (1, 0)|^2) <= 0. The squared
+    distances of the grid points are computed once, so moving blue only
+    costs two subtractions, a product and a comparison, all written in place
+    into arrays allocated here.
+
+    Parameters:
+        extent (tuple): The grid bounds (x_min, x_max, y_min, y_max).
+        resolution (int): The number of grid points along each axis.
+    """
+
+    def __init__(self, extent=(-1, 2, -1, 2), resolution=600):
+        self.extent = extent
+        self.resolution = resolution
+        x = np.linspace(extent[0], extent[1], resolution)
+        y = np.linspace(extent[2], extent[3], resolution)
+        X, Y = np.meshgrid(x, y)
+
+        # Squared distances of every red point to the two circle centres
+        self.sq_dist_1 = X**2 + Y**2
+        self.sq_dist_2 = self.sq_dist_1 - 2 * X + 1
+
+        self.work = np.empty((2,) + X.shape)
+        self.mask = np.empty(X.shape, dtype=bool)
+
+    def update(self, blue_x, blue_y):
+        """
+        Recompute the feasible region for a new blue point.
+
+        Parameters:
+            blue_x (float): The x coordinate of the blue point.
+            blue_y (float): The y coordinate of the blue point.
+
+        Returns:
+            np.ndarray: The feasibility mask, overwritten by the next update.
+        """
+        inside_1, inside_2 = self.work
+        np.subtract(self.sq_dist_1, blue_x**2 + blue_y**2, out=inside_1)
+        np.subtract(self.sq_dist_2, (1 - blue_x)**2 + blue_y**2, out=inside_2)
+        inside_1 *= inside_2
+        np.less_equal(inside_1, 0, out=self.mask)
+        return self.mask
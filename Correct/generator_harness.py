@@ -0,0 +1,167 @@
+import os
+import sys
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+import numpy as np
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+from bisector_kernels import DEFAULT_CHUNK_SIZE
+from parallel import task_seed
+from triangle_sampling import iter_bounded_chunks
+
+# Outcome of streaming one generator through the estimator
+GeneratorResult = namedtuple('GeneratorResult', ['name', 'hits', 'num_points', 'seconds', 'peak_rss', 'quality'],
+                             defaults=(None,))
+
+
+def bounded_pair_hits(x1, y1, x2, y2):
+    """
+    Count the pairs whose perpendicular bisector crosses y = 0 between x = 0 and x = 1.
+
+    For a blue point (x1, y1) in the triangle y < x, y < 1 - x that side is the
+    closest one. The bisector meets y = 0 at
+    x = ((x1^2 - x2^2) + (y1^2 - y2^2)) / (2 (x1 - x2)), which lies in [0, 1]
+    exactly when the numerator and numerator + 2 (x2 - x1) do not share a
+    sign, so the test needs no division. The red coordinates are overwritten.
+
+    Parameters:
+        x1, y1 (np.ndarray): The blue points, in the triangle.
+        x2, y2 (np.ndarray): The red points.
+
+    Returns:
+        int: The number of hits.
+    """
+    # Numerator |B|^2 - |R|^2, i.e. the value at x = 0 of the bisector equation, kept in y2
+    x2 -= x1
+    y2 *= y2
+    np.subtract(x1 * x1 + y1 * y1, y2, out=y2)
+    y2 -= (x2 + x1) ** 2
+
+    # Its value at x = 1, kept in x2
+    x2 *= 2
+    x2 += y2
+    x2 *= y2
+    return int(np.count_nonzero(x2 <= 0))
+
+
+def peak_rss():
+    """
+    The peak resident memory of the current process so far.
+
+    Returns:
+        int: The peak RSS in bytes, or None where the resource module is
+            unavailable (Windows).
+    """
+    if resource is None:
+        return None
+    # ru_maxrss is in kilobytes on Linux (bytes on macOS)
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def _tapped_draw(draw, accumulator, size):
+    # Draw as usual, recording the draws before the caller overwrites them
+    draws = draw(size)
+    accumulator.update(draws)
+    return draws
+
+
+def stream_generator(name, factory, seed_seq, num_points, chunk_size=DEFAULT_CHUNK_SIZE, quality=False):
+    """
+    Stream num_points blue/red pairs from one generator through the estimator.
+
+    The generator is built once from its seed and then drawn from chunk by
+    chunk, so only one chunk of samples is alive at a time. With quality set,
+    every draw is also fed to the streaming tests of rng_quality before it is
+    used.
+
+    Parameters:
+        name (str): The name of the generator.
+        factory (callable): Picklable factory(seed_seq) returning draw(size), which
+            returns an array of size uniform draws in [0, 1).
+        seed_seq (np.random.SeedSequence): The seed of the generator.
+        num_points (int): The number of pairs to simulate.
+        chunk_size (int): The number of pairs per chunk.
+        quality (bool): Whether to run the statistical-quality tests on the draws.
+
+    Returns:
+        GeneratorResult: The hit count, wall time, peak resident memory (bytes,
+            None where unavailable) and quality test results (None unless
+            requested) of the run.
+    """
+    start_time = time.perf_counter()
+    draw = factory(seed_seq)
+    accumulator = None
+    if quality:
+        # Imported here so that scipy is only loaded when the tests are run
+        from rng_quality import QualityAccumulator
+        accumulator = QualityAccumulator()
+        draw = partial(_tapped_draw, draw, accumulator)
+
+    hits = 0
+    for _, x1, y1 in iter_bounded_chunks(draw, num_points, chunk_size):
+        x2 = np.asarray(draw(len(x1)), dtype=float)
+        y2 = np.asarray(draw(len(x1)), dtype=float)
+        hits += bounded_pair_hits(x1, y1, x2, y2)
+    seconds = time.perf_counter() - start_time
+
+    quality_results = accumulator.results() if accumulator is not None else None
+    return GeneratorResult(name, hits, num_points, seconds, peak_rss(), quality_results)
+
+
+def _run_generators(task, names, factories, seeds, workers):
+    # One fresh worker process per generator, so each one's peak memory is its own
+    if not names:
+        return
+    if workers == 1:
+        yield from map(task, names, factories, seeds)
+        return
+    with ProcessPoolExecutor(max_workers=min(workers, len(names)), max_tasks_per_child=1) as pool:
+        yield from pool.map(task, names, factories, seeds)
+
+
+def compare_generators(registry, num_points, root_seed=None, workers=None, chunk_size=DEFAULT_CHUNK_SIZE,
+                       quality=False, cached=None):
+    """
+    Stream every generator of a registry through the estimator concurrently.
+
+    Each generator runs in its own worker process (a fresh one per generator,
+    so the peak memory reported is that generator's alone) from seed
+    task_seed(root_seed, i), where i is its position in the registry, so the
+    counts do not depend on the number of workers. Generators with a result
+    in cached are not run again.
+
+    Parameters:
+        registry (dict): Maps generator names to picklable factories (see stream_generator).
+        num_points (int): The number of pairs per generator.
+        root_seed (int, SeedSequence or None): The root seed of the run.
+        workers (int): The number of worker processes (os.cpu_count() if None, in-process if 1).
+        chunk_size (int): The number of pairs per chunk.
+        quality (bool): Whether to run the statistical-quality tests on every generator.
+        cached (dict): Maps generator names to results of earlier identical runs.
+
+    Yields:
+        GeneratorResult: The result of each generator, in registry order.
+    """
+    if not isinstance(root_seed, np.random.SeedSequence):
+        root_seed = np.random.SeedSequence(root_seed)
+    if workers is None:
+        workers = os.cpu_count()
+    if cached is None:
+        cached = {}
+
+    # Generators keep the seed of their position in the registry, whether cached or not
+    task = partial(stream_generator, num_points=num_points, chunk_size=chunk_size, quality=quality)
+    names = [name for name in registry if name not in cached]
+    factories = [registry[name] for name in names]
+    seeds = [task_seed(root_seed, i) for i, name in enumerate(registry) if name not in cached]
+    results = _run_generators(task, names, factories, seeds, workers)
+    for name in registry:
+        yield cached[name] if name in cached else next(results)
@@ -0,0 +1,153 @@
+import numpy as np
+
+from bisector_kernels import DEFAULT_CHUNK_SIZE
+from streaming import stream_hit_count
+
+# Bits per coordinate of the integer lattice. The kernel's values stay below
+# 2**(2 * bits + 3) + 2**(2 * bits + 2), so 29 bits is the most int64 arithmetic
+# can hold exactly
+DEFAULT_LATTICE_BITS = 29
+
+
+class LatticeBuffers:
+    """
+    Preallocated int64 scratch arrays for exact integer chunk kernels.
+
+    Coordinates live on the lattice of cell centres (k + 1/2) / 2**bits,
+    like the Fraction(k, N) points of Visualize point.py, stored centred on
+    (1/2, 1/2) and scaled by 2**(bits + 1): coordinate k becomes the odd
+    integer 2k + 1 - 2**bits. Odd coordinates never lie on the lines
+    x = 1/2 or y = 1/2, but they do lie on the diagonals of the square: a
+    blue point there (probability 2**(1 - bits) per pair) is equally close
+    to two sides, see lattice_folded_hits. The rows are filled straight
+    from the bit generator's raw 64-bit output, two coordinates per word,
+    so no floating-point value is formed.
+
+    Parameters:
+        chunk_size (int): The number of blue/red pairs held per chunk.
+        bits (int): The number of bits per coordinate (1 to 29).
+    """
+
+    def __init__(self, chunk_size=DEFAULT_CHUNK_SIZE, bits=DEFAULT_LATTICE_BITS):
+        if not 1 <= bits <= DEFAULT_LATTICE_BITS:
+            raise ValueError(f"bits must be between 1 and {DEFAULT_LATTICE_BITS}, got {bits}")
+        self.chunk_size = chunk_size
+        self.bits = bits
+        self.coords = np.empty((4, chunk_size), dtype=np.int64)  # Rows: blue x, blue y, red x, red y
+        self.work = np.empty((2, chunk_size), dtype=np.int64)
+        self.masks = np.empty((2, chunk_size), dtype=bool)
+
+    def fill(self, rng, n):
+        """
+        Draw n fresh blue and red lattice points into the coordinate rows.
+
+        Parameters:
+            rng (np.random.Generator): The generator to draw from, with a 64-bit
+                bit generator (any of NumPy's except MT19937).
+            n (int): The number of pairs to draw (at most chunk_size).
+        """
+        if isinstance(rng.bit_generator, np.random.MT19937):
+            raise ValueError("MT19937 only produces 32 random bits per raw output")
+        raw = rng.bit_generator.random_raw(2 * n).view(np.int32).reshape(4, n)
+
+        # The top bits + 1 bits of a word, read as a signed integer, are uniform on
+        # [-2**bits, 2**bits); setting the lowest one makes them a uniform odd coordinate.
+        # The shift works in place on the fresh raw block, and the cast is the only int64 pass
+        np.right_shift(raw, 31 - self.bits, out=raw)
+        raw |= 1
+        self.coords[:, :n] = raw
+
+
+def lattice_folded_hits(buffers, n):
+    """
+    Count the pairs whose perpendicular bisector crosses the side of the unit
+    square closest to the blue point, exactly, on integer lattice coordinates.
+
+    This is bisector_kernels.folded_bottom_side_hits in integers: with the
+    coordinates scaled by S = 2**(bits + 1), h is an integer in units of
+    1/S**2 and the corners of the square lie at +-S/2, so the test becomes
+    |h - S Dy| <= S |Dx| with every product a polynomial in the
+    coordinates. The products stay below 2**(2 * bits + 3) and the value
+    compared below 2**(2 * bits + 3) + 2**(2 * bits + 2), so the int64
+    arithmetic never overflows and every pair is decided exactly: no
+    division, NaN or rounding. The count agrees with the Fraction logic of
+    Visualize point.py on every lattice pair except two kinds of ties: red
+    on blue, and blue on a diagonal of the square (probability 2**(1 - bits)
+    per pair), which is equally close to two sides; the kernel then tests
+    the one the fold maps to y = 0, which need not be the one Visualize
+    point.py picks. The coordinate rows are overwritten and the indicator of
+    every pair is left in masks[0].
+
+    Parameters:
+        buffers (LatticeBuffers): Buffers holding the pairs in their first n columns.
+        n (int): The number of pairs to evaluate.
+
+    Returns:
+        int: The number of pairs whose bisector crosses the closest side.
+    """
+    coords = buffers.coords[:, :n]
+    bx, by, rx, ry = coords
+    blue, red = coords[:2], coords[2:]
+    work = buffers.work[:, :n]
+    dx, dy = work
+    mask = buffers.masks[0, :n]
+
+    # D = R - B and -h = (R - B) . (R + B), kept in rx; both axes go through each call at once
+    np.subtract(red, blue, out=work)
+    red += blue
+    red *= work
+    rx += ry
+
+    # Reflect across x = 1/2 where blue lies left of it and across y = 1/2 where it lies
+    # above it; the coordinates are odd, so their signs are never 0. dy is left negated,
+    # which turns the reflection across y = 1 - x below into a plain swap
+    np.sign(bx, out=ry)
+    dx *= ry
+    np.sign(by, out=ry)
+    dy *= ry
+
+    # Reflect across y = 1 - x, (Dx, Dy) -> (-Dy, -Dx), wherever blue is now closer
+    # to x = 1 than to y = 0
+    np.abs(blue, out=blue)
+    np.greater(bx, by, out=mask)
+    np.subtract(dx, dy, out=ry)
+    ry *= mask
+    dx -= ry
+    dy += ry
+
+    # The bisector crosses y = 0 between its corners when |h - S Dy| <= S |Dx|
+    scale = buffers.bits + 1
+    dy <<= scale
+    rx -= dy
+    np.abs(rx, out=rx)
+    np.abs(dx, out=dx)
+    dx <<= scale
+    np.less_equal(rx, dx, out=mask)
+    return int(np.count_nonzero(mask))
+
+
+def lattice_hit_count(num_points, rng=None, bits=DEFAULT_LATTICE_BITS, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Count bisector hits exactly over num_points pairs of lattice points.
+
+    The lattice has 2**bits points per axis, so it differs from the uniform
+    distribution on the square by at most a cell of 2**-bits; at the default
+    29 bits that is far below the resolution of any feasible run.
+
+    Its cost is about that of the float64 folded kernel, both being bound by
+    whole-array passes over the chunk. On one core at 5 million pairs it
+    measured 0.17 to 0.19 s against 0.23 to 0.26 s for stream_hit_count
+    with folded_bottom_side_hits, but other machines have shown the two
+    level; choose it for exactness, not speed.
+
+    Parameters:
+        num_points (int): The total number of pairs to simulate.
+        rng (np.random.Generator): The generator to draw from (a fresh default one if None).
+        bits (int): The number of bits per coordinate.
+        chunk_size (int): The number of pairs per chunk.
+
+    Returns:
+        int: The number of pairs whose bisector crosses the closest side.
+    """
+    buffers = LatticeBuffers(max(1, min(chunk_size, num_points)), bits)
+    return stream_hit_count(num_points, rng, kernel=lattice_folded_hits, buffers=buffers)
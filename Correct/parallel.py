@@ -0,0 +1,118 @@
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+import numpy as np
+
+from bisector_kernels import DEFAULT_CHUNK_SIZE, folded_bottom_side_hits
+from streaming import stream_hit_count
+
+# Pairs per task when a single large run is split across the pool
+DEFAULT_TASK_SIZE = 50_000_000
+
+
+def task_seed(root_seed, index):
+    """
+    Return the SeedSequence of task `index` under `root_seed`.
+
+    This is exactly the child that root_seed.spawn() would hand out at that
+    position, but it does not depend on how many children were spawned
+    before, so every task gets the same stream however the tasks are
+    scheduled or how many workers there are.
+
+    Parameters:
+        root_seed (int, SeedSequence or None): The root seed of the run.
+        index (int): The position of the task in the run.
+
+    Returns:
+        np.random.SeedSequence: The independent seed of that task.
+    """
+    if not isinstance(root_seed, np.random.SeedSequence):
+        root_seed = np.random.SeedSequence(root_seed)
+    return np.random.SeedSequence(root_seed.entropy, spawn_key=root_seed.spawn_key + (index,),
+                                  pool_size=root_seed.pool_size)
+
+
+def _run_task(count_fn, bit_generator, num_points, seed_seq):
+    # Each task builds its own generator from its own non-overlapping seed
+    rng = np.random.Generator(bit_generator(seed_seq))
+    return count_fn(num_points, rng)
+
+
+def iter_task_counts(task_sizes, root_seed, workers=None, count_fn=None, bit_generator=np.random.PCG64,
+                     start_index=0):
+    """
+    Run one counting task per entry of task_sizes across a process pool.
+
+    Task i draws from task_seed(root_seed, start_index + i), so the per-task
+    counts (and therefore every merged total) depend only on the root seed
+    and the task sizes, never on the number of workers. Successive calls
+    with increasing start_index continue the same run. Tasks are submitted
+    a few ahead of the one being yielded, so task_sizes may be an endless
+    iterator: the pool stays busy until the caller closes the generator,
+    which cancels the tasks not yet started.
+
+    Parameters:
+        task_sizes (iterable of int): The number of pairs simulated by each task.
+        root_seed (int, SeedSequence or None): The root seed of the run.
+        workers (int): The number of worker processes (os.cpu_count() if None, in-process if 1).
+        count_fn (callable): Picklable count_fn(num_points, rng) returning a hit count
+            (the chunked folded kernel if None).
+        bit_generator (type): The bit generator class seeded with each task's SeedSequence.
+        start_index (int): The index of the first task in the run.
+
+    Yields:
+        int: The hit count of each task, in task order.
+    """
+    if not isinstance(root_seed, np.random.SeedSequence):
+        root_seed = np.random.SeedSequence(root_seed)
+    if count_fn is None:
+        count_fn = partial(stream_hit_count, chunk_size=DEFAULT_CHUNK_SIZE, kernel=folded_bottom_side_hits)
+    if workers is None:
+        workers = os.cpu_count()
+
+    task = partial(_run_task, count_fn, bit_generator)
+    tasks = ((size, task_seed(root_seed, start_index + i)) for i, size in enumerate(task_sizes))
+    if workers == 1:
+        for size, seed_seq in tasks:
+            yield task(size, seed_seq)
+        return
+
+    # Keep twice as many tasks queued as there are workers, so none waits on the caller
+    pool = ProcessPoolExecutor(max_workers=workers)
+    try:
+        pending = deque()
+        for size, seed_seq in tasks:
+            pending.append(pool.submit(task, size, seed_seq))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def parallel_hit_count(num_points, root_seed, workers=None, task_size=DEFAULT_TASK_SIZE,
+                       count_fn=None, bit_generator=np.random.PCG64):
+    """
+    Count bisector hits over num_points pairs split into fixed-size tasks.
+
+    The split depends only on num_points and task_size, and the counts are
+    integers, so the merged total is exact and reproducible from root_seed
+    for any number of workers.
+
+    Parameters:
+        num_points (int): The total number of pairs to simulate.
+        root_seed (int, SeedSequence or None): The root seed of the run.
+        workers (int): The number of worker processes (os.cpu_count() if None).
+        task_size (int): The number of pairs per task.
+        count_fn (callable): Picklable count_fn(num_points, rng) returning a hit count.
+        bit_generator (type): The bit generator class seeded with each task's SeedSequence.
+
+    Returns:
+        int: The total number of hits.
+    """
+    full, rest = divmod(num_points, task_size)
+    task_sizes = [task_size] * full + ([rest] if rest else [])
+    return sum(iter_task_counts(task_sizes, root_seed, workers, count_fn, bit_generator))
@@ -0,0 +1,77 @@
+from functools import partial
+
+import numpy as np
+from scipy.stats.qmc import Sobol
+
+from bisector_kernels import ChunkBuffers, folded_bottom_side_hits
+from parallel import iter_task_counts
+
+# Sobol' points are drawn 2**DEFAULT_SOBOL_CHUNK_M at a time
+DEFAULT_SOBOL_CHUNK_M = 16
+
+
+def sobol_hit_count(num_points, rng, start=0, chunk_m=DEFAULT_SOBOL_CHUNK_M, kernel=folded_bottom_side_hits,
+                    dtype=np.float64):
+    """
+    Count bisector hits over a scrambled Sobol' sequence, one chunk at a time.
+
+    The 4-D points (blue x, blue y, red x, red y) are drawn in chunks of
+    2**chunk_m, so with num_points and start multiples of the chunk size
+    every chunk is an aligned block of the sequence and the balance
+    properties of the whole 2**m points are kept, while only one chunk is
+    ever in memory. start skips the first points with fast_forward, so a
+    long sequence can be split into pieces or extended later under the
+    same scrambling. With dtype float32 the points are rounded once as they
+    are copied in and the kernel runs in float32.
+
+    Parameters:
+        num_points (int): The number of points to draw (a power of 2 for balance).
+        rng (np.random.Generator): The generator seeding the scrambling.
+        start (int): The index of the first point in the sequence.
+        chunk_m (int): Log2 of the number of points per chunk.
+        kernel (callable): Kernel counting hits in the first n columns of the buffers.
+        dtype (type): The floating-point type the kernel computes in.
+
+    Returns:
+        int: The number of hits.
+    """
+    sampler = Sobol(d=4, scramble=True, seed=rng)
+    if start:
+        sampler.fast_forward(start)
+    chunk_size = min(2**chunk_m, num_points)
+    buffers = ChunkBuffers(max(chunk_size, 1), dtype=dtype)
+
+    hits = 0
+    for offset in range(0, num_points, chunk_size):
+        n = min(chunk_size, num_points - offset)
+        np.copyto(buffers.coords[:, :n], sampler.random(n).T, casting='same_kind')
+        hits += kernel(buffers, n)
+    return hits
+
+
+def rqmc_estimate(m, num_replicates=16, root_seed=None, workers=None, chunk_m=DEFAULT_SOBOL_CHUNK_M,
+                  kernel=folded_bottom_side_hits):
+    """
+    Randomized quasi-Monte Carlo estimate with an error estimate.
+
+    Each of the num_replicates runs uses its own independent scrambling of
+    the first 2**m Sobol' points, so the replicate estimates are independent
+    and unbiased and their spread gives the standard error. The replicates
+    run across the process pool like the tasks of parallel.py.
+
+    Parameters:
+        m (int): Log2 of the number of points per replicate.
+        num_replicates (int): The number of independent scramblings.
+        root_seed (int, SeedSequence or None): The root seed of the run.
+        workers (int): The number of worker processes (os.cpu_count() if None, in-process if 1).
+        chunk_m (int): Log2 of the number of points per chunk.
+        kernel (callable): Picklable kernel counting hits in the first n columns of the buffers.
+
+    Returns:
+        tuple: The mean estimate, its standard error and the replicate estimates.
+    """
+    num_points = 2**m
+    count_fn = partial(sobol_hit_count, chunk_m=chunk_m, kernel=kernel)
+    counts = iter_task_counts([num_points] * num_replicates, root_seed, workers, count_fn)
+    estimates = np.fromiter(counts, dtype=float, count=num_replicates) / num_points
+    return estimates.mean(), estimates.std(ddof=1) / np.sqrt(num_replicates), estimates
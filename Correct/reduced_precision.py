@@ -0,0 +1,195 @@
+import time
+from collections import namedtuple
+
+import numpy as np
+
+from bisector_kernels import DEFAULT_CHUNK_SIZE, ChunkBuffers, folded_bottom_side_hits
+from streaming import stream_hit_count
+
+# Pairs compared per mode, and the seed of the analysis
+num_points = 20_000_000
+seed = 12345
+
+# Bits per coordinate of the fixed-point mode. Cell centres (k + 1/2) / 2**bits centred on
+# 1/2 are odd multiples of 2**-(bits + 1), so every product and sum of the folded kernel is
+# exact in float32 up to 10 bits; but the lattice bias at 10 bits already matters beyond a
+# few million pairs, so the default trades exact arithmetic for a finer lattice
+DEFAULT_FIXED_POINT_BITS = 16
+
+# Outcome of a paired precision comparison: the bias of the reduced mode against float64,
+# its standard error, the fraction of pairs whose outcome differs and the number of pairs
+PrecisionBias = namedtuple('PrecisionBias', ['precision', 'bias', 'standard_error', 'disagreement', 'num_points'])
+
+
+class FixedPointBuffers(ChunkBuffers):
+    """
+    Float32 chunk buffers filled with fixed-point coordinates.
+
+    Every coordinate is the top `bits` bits of a raw 32-bit word k, placed
+    at the centre (k + 1/2) / 2**bits of its cell, so generation is one
+    shift and one conversion per coordinate with no floating-point
+    rounding, and no point ever lies on a side of the square. The raw
+    words come straight from the bit generator, which must produce 64
+    random bits per call (any of NumPy's except MT19937).
+
+    Parameters:
+        chunk_size (int): The number of blue/red pairs held per chunk.
+        bits (int): The number of bits per coordinate (1 to 23).
+    """
+
+    def __init__(self, chunk_size=DEFAULT_CHUNK_SIZE, bits=DEFAULT_FIXED_POINT_BITS):
+        if not 1 <= bits <= 23:
+            raise ValueError(f"bits must be between 1 and 23, got {bits}")
+        super().__init__(chunk_size, dtype=np.float32)
+        self.bits = bits
+        self.words = np.empty((4, chunk_size), dtype=np.uint32)
+
+    def fill(self, rng, n):
+        if isinstance(rng.bit_generator, np.random.MT19937):
+            raise ValueError("MT19937 only produces 32 random bits per raw output")
+        words = self.words[:, :n]
+        raw = rng.bit_generator.random_raw(2 * n).view(np.uint32).reshape(4, n)
+        np.right_shift(raw, 32 - self.bits, out=words)
+        coords = self.coords[:, :n]
+        np.copyto(coords, words, casting='unsafe')
+        coords += 0.5
+        coords *= np.float32(2.0 ** -self.bits)
+
+
+# Buffer factories of the sampling modes, called with the chunk size and the bits per
+# coordinate of the fixed-point mode (ignored by the floating-point ones)
+PRECISIONS = {
+    'float64': lambda chunk_size, bits: ChunkBuffers(chunk_size),
+    'float32': lambda chunk_size, bits: ChunkBuffers(chunk_size, dtype=np.float32),
+    'fixed32': FixedPointBuffers,
+}
+
+
+def precision_hit_count(num_points, rng=None, precision='float32', chunk_size=DEFAULT_CHUNK_SIZE,
+                        kernel=folded_bottom_side_hits, bits=DEFAULT_FIXED_POINT_BITS):
+    """
+    stream_hit_count in one of the sampling modes of PRECISIONS.
+
+    Run the analysis of this module first: a reduced mode is only worth
+    using for runs short enough that its bias stays far below the Monte
+    Carlo error (see max_points_for_bias).
+
+    Parameters:
+        num_points (int): The total number of pairs to simulate.
+        rng (np.random.Generator): The generator to draw from (a fresh default one if None).
+        precision (str): The sampling mode: 'float64', 'float32' or 'fixed32'.
+        chunk_size (int): The number of pairs per chunk.
+        kernel (callable): Kernel counting hits in the first n columns of the buffers.
+        bits (int): The number of bits per coordinate of the fixed-point mode.
+
+    Returns:
+        int: The number of pairs whose bisector crosses the closest side.
+    """
+    buffers = PRECISIONS[precision](max(1, min(chunk_size, num_points)), bits)
+    return stream_hit_count(num_points, rng, kernel=kernel, buffers=buffers)
+
+
+def _reduce(source, target, precision, bits, scratch):
+    # The coordinates the reduced mode would have drawn from the same uniforms: float32
+    # draws keep the top 24 bits, fixed-point ones the centre of the top-bits cell. The
+    # truncation is done in float64, where scaling is exact, and only its result is cast
+    scale = 2.0 ** (24 if precision == 'float32' else bits)
+    for source_row, target_row in zip(source, target):
+        np.multiply(source_row, scale, out=scratch)
+        np.floor(scratch, out=scratch)
+        if precision == 'fixed32':
+            scratch += 0.5
+        scratch /= scale
+        np.copyto(target_row, scratch, casting='same_kind')
+
+
+def precision_bias(num_points, rng=None, precision='float32', bits=DEFAULT_FIXED_POINT_BITS,
+                   chunk_size=DEFAULT_CHUNK_SIZE, kernel=folded_bottom_side_hits):
+    """
+    Measure the bias of a reduced-precision sampling mode against float64.
+
+    Every pair is evaluated twice, once in float64 and once after rounding
+    its coordinates as the reduced mode would have drawn them, with the
+    kernel computing in float32. Since the two evaluations share their
+    samples, the bias is the difference between the pairs only the reduced
+    mode counts and those only float64 counts, and its standard error
+    (from the disagreement count, as in McNemar's test) is far smaller than
+    the Monte Carlo error of either estimate.
+
+    Parameters:
+        num_points (int): The number of pairs to compare.
+        rng (np.random.Generator): The generator to draw from (a fresh default one if None).
+        precision (str): The reduced mode: 'float32' or 'fixed32'.
+        bits (int): The number of bits per coordinate of the fixed-point mode.
+        chunk_size (int): The number of pairs per chunk.
+        kernel (callable): Kernel counting hits in the first n columns of the buffers.
+
+    Returns:
+        PrecisionBias: The bias, its standard error and the disagreement rate.
+    """
+    if rng is None:
+        rng = np.random.default_rng()
+    chunk_size = max(1, min(chunk_size, num_points))
+    exact = ChunkBuffers(chunk_size)
+    reduced = ChunkBuffers(chunk_size, dtype=np.float32)
+    gained = lost = 0
+    for start in range(0, num_points, chunk_size):
+        n = min(chunk_size, num_points - start)
+        exact.fill(rng, n)
+        _reduce(exact.coords[:, :n], reduced.coords[:, :n], precision, bits, exact.work[0, :n])
+        kernel(exact, n)
+        kernel(reduced, n)
+        exact_hits, reduced_hits = exact.masks[0, :n], reduced.masks[0, :n]
+        differ = exact.masks[1, :n]
+        np.not_equal(exact_hits, reduced_hits, out=differ)
+        changed = int(np.count_nonzero(differ))
+        differ &= reduced_hits
+        gained += int(np.count_nonzero(differ))
+        lost += changed - int(np.count_nonzero(differ))
+    return PrecisionBias(precision, (gained - lost) / num_points, np.sqrt(gained + lost) / num_points,
+                         (gained + lost) / num_points, num_points)
+
+
+def max_points_for_bias(result, probability=0.4914, ratio=10):
+    """
+    The largest run for which a reduced mode's bias is negligible.
+
+    When no pair disagreed, the bias is only known to be below the
+    disagreement rate, which the rule of three bounds by 3 / num_points
+    (at 95% confidence), so the limit stays finite however exact the
+    comparison looked.
+
+    Parameters:
+        result (PrecisionBias): The measured bias.
+        probability (float): The probability being estimated.
+        ratio (int): How many times the Monte Carlo standard error must exceed
+            the bias bound (|bias| + 3 standard errors).
+
+    Returns:
+        float: The number of pairs up to which the reduced mode can be used.
+    """
+    if result.disagreement == 0:
+        bound = 3 / result.num_points
+    else:
+        bound = abs(result.bias) + 3 * result.standard_error
+    return probability * (1 - probability) / (ratio * bound) ** 2
+
+
+if __name__ == "__main__":
+    rng = np.random.default_rng(seed)
+    print(f"{'Mode':<14}{'Bias':>11}{'Std error':>11}{'Disagree':>10}{'Safe up to':>12}{'Samples/s':>11}")
+    for precision, bits in (('float64', None), ('float32', None), ('fixed32', 10),
+                            ('fixed32', DEFAULT_FIXED_POINT_BITS), ('fixed32', 20)):
+        # Throughput of the mode itself
+        buffers = PRECISIONS[precision](DEFAULT_CHUNK_SIZE, bits)
+        start_time = time.perf_counter()
+        stream_hit_count(num_points, rng, buffers=buffers)
+        speed = num_points / (time.perf_counter() - start_time)
+
+        name = precision if bits is None else f"{precision}/{bits}"
+        if precision == 'float64':
+            print(f"{name:<14}{'-':>11}{'-':>11}{'-':>10}{'-':>12}{speed:>11.2e}")
+            continue
+        result = precision_bias(num_points, rng, precision, bits)
+        print(f"{name:<14}{result.bias:>11.1e}{result.standard_error:>11.1e}{result.disagreement:>10.1e}"
+              f"{max_points_for_bias(result):>12.1e}{speed:>11.2e}")
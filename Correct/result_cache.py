@@ -0,0 +1,236 @@
+import hashlib
+import importlib.util
+import inspect
+import json
+import sqlite3
+from functools import partial
+
+import numpy as np
+
+from parallel import iter_task_counts
+
+# Default location of the cache, next to the scripts that use it
+DEFAULT_CACHE_PATH = 'results.sqlite'
+
+
+def code_version(*objects):
+    """
+    Fingerprint the source code behind some functions, classes or modules.
+
+    The fingerprint hashes the source files of the modules defining the
+    objects (looking inside functools.partial objects), so editing any of
+    them invalidates the cached results computed with them. Modules can also
+    be named, which locates their source without importing them.
+
+    Parameters:
+        *objects: The functions, classes, partials, modules or module names a result depends on.
+
+    Returns:
+        str: The hex digest of the source files.
+    """
+    files = set()
+    pending = list(objects)
+    while pending:
+        obj = pending.pop()
+        if isinstance(obj, partial):
+            pending.append(obj.func)
+            pending.extend(arg for arg in (*obj.args, *obj.keywords.values()) if callable(arg))
+            continue
+        if isinstance(obj, str):
+            path = importlib.util.find_spec(obj).origin
+        else:
+            module = obj if inspect.ismodule(obj) else inspect.getmodule(obj)
+            path = getattr(module, '__file__', None)
+        if path is not None and not path.endswith(('.so', '.pyd')):
+            files.add(path)
+
+    digest = hashlib.sha256()
+    for path in sorted(files):
+        with open(path, 'rb') as source:
+            digest.update(source.read())
+    return digest.hexdigest()[:16]
+
+
+def seed_key(root_seed):
+    """
+    Describe a root seed by the entropy and spawn key that determine its streams.
+
+    Parameters:
+        root_seed (int or SeedSequence): The root seed of a run.
+
+    Returns:
+        list: A JSON-serializable description of the seed.
+    """
+    if not isinstance(root_seed, np.random.SeedSequence):
+        root_seed = np.random.SeedSequence(root_seed)
+    return [str(root_seed.entropy), list(root_seed.spawn_key)]
+
+
+class ResultCache:
+    """
+    On-disk SQLite cache of per-task hit counts and computed values.
+
+    Results are stored under a key made of the method name, its parameters,
+    the root seed and the code version, so a cached result is only reused
+    for exactly the computation that produced it. Hit counts are stored per
+    task as soon as each task completes: since task i always draws from
+    task_seed(root_seed, i), a run with more tasks extends the cached tally
+    and an interrupted run resumes after the last completed task.
+
+    Parameters:
+        path (str): The SQLite database file (created if missing).
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_PATH):
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        with self.connection:
+            self.connection.execute('CREATE TABLE IF NOT EXISTS task_counts '
+                                    '(key TEXT, task_index INTEGER, num_points INTEGER, hits INTEGER, '
+                                    'PRIMARY KEY (key, task_index))')
+            self.connection.execute('CREATE TABLE IF NOT EXISTS cached_values '
+                                    '(key TEXT PRIMARY KEY, value TEXT)')
+
+    def close(self):
+        self.connection.close()
+
+    @staticmethod
+    def key(method, params, seed=None, version=''):
+        """
+        Build the cache key of a computation.
+
+        Parameters:
+            method (str): The name of the estimator or computation.
+            params (dict): Its JSON-serializable parameters.
+            seed (int, SeedSequence or None): The root seed, if the result is random.
+            version (str): The code version (see code_version).
+
+        Returns:
+            str: The key.
+        """
+        description = {'method': method, 'params': params, 'version': version,
+                       'seed': seed_key(seed) if seed is not None else None}
+        return hashlib.sha256(json.dumps(description, sort_keys=True).encode()).hexdigest()
+
+    def root_seed(self, name, seed=None):
+        """
+        The root seed of a run, keeping the same fresh entropy from run to run.
+
+        An explicit seed is used as given. Without one, the entropy drawn for
+        the first run of `name` is stored and reused by every later run, so
+        re-running resumes or extends the cached tallies instead of starting
+        a new, unreachable one; delete the cache or pass a seed to start afresh.
+
+        Parameters:
+            name (str): The name of the script or computation.
+            seed (int, SeedSequence or None): The seed, if any.
+
+        Returns:
+            np.random.SeedSequence: The root seed.
+        """
+        if seed is not None:
+            return seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed)
+        key = self.key(name, {'root_entropy': True})
+        entropy = self.get_value(key)
+        if entropy is None:
+            entropy = str(np.random.SeedSequence().entropy)
+            self.store_value(key, entropy)
+        return np.random.SeedSequence(int(entropy))
+
+    def task_counts(self, key):
+        """
+        Return the cached tasks of a run.
+
+        Parameters:
+            key (str): The key of the run.
+
+        Returns:
+            dict: Maps task indices to (num_points, hits).
+        """
+        rows = self.connection.execute('SELECT task_index, num_points, hits FROM task_counts WHERE key = ?', (key,))
+        return {index: (num_points, hits) for index, num_points, hits in rows}
+
+    def store_task_count(self, key, index, num_points, hits):
+        with self.connection:
+            self.connection.execute('INSERT OR REPLACE INTO task_counts VALUES (?, ?, ?, ?)',
+                                    (key, index, num_points, hits))
+
+    def iter_task_counts(self, key, task_sizes, root_seed, workers=None, count_fn=None,
+                         bit_generator=np.random.PCG64):
+        """
+        parallel.iter_task_counts, reusing the cached tasks of the run.
+
+        Tasks already cached with the same size are yielded from the cache;
+        the others are computed, consecutive ones together across the pool,
+        and each one is stored as soon as it completes.
+
+        Parameters:
+            key (str): The key of the run, which must not depend on the number of tasks.
+            task_sizes (list of int): The number of pairs simulated by each task.
+            root_seed (int or SeedSequence): The root seed of the run.
+            workers (int): The number of worker processes (os.cpu_count() if None, in-process if 1).
+            count_fn (callable): Picklable count_fn(num_points, rng) returning a hit count.
+            bit_generator (type): The bit generator class seeded with each task's SeedSequence.
+
+        Yields:
+            int: The hit count of each task, in task order.
+        """
+        cached = self.task_counts(key)
+        index = 0
+        while index < len(task_sizes):
+            if cached.get(index, (None,))[0] == task_sizes[index]:
+                yield cached[index][1]
+                index += 1
+                continue
+
+            # Compute the run of consecutive tasks missing from the cache
+            stop = index
+            while stop < len(task_sizes) and cached.get(stop, (None,))[0] != task_sizes[stop]:
+                stop += 1
+            counts = iter_task_counts(task_sizes[index:stop], root_seed, workers, count_fn, bit_generator,
+                                      start_index=index)
+            for hits in counts:
+                self.store_task_count(key, index, task_sizes[index], hits)
+                yield hits
+                index += 1
+
+    def get_value(self, key):
+        """
+        Return a cached value.
+
+        Parameters:
+            key (str): The key of the value.
+
+        Returns:
+            The value, or None if it is not cached.
+        """
+        row = self.connection.execute('SELECT value FROM cached_values WHERE key = ?', (key,)).fetchone()
+        return json.loads(row[0]) if row is not None else None
+
+    def store_value(self, key, value):
+        """
+        Store a JSON-serializable value.
+
+        Parameters:
+            key (str): The key of the value.
+            value: The value.
+        """
+        with self.connection:
+            self.connection.execute('INSERT OR REPLACE INTO cached_values VALUES (?, ?)', (key, json.dumps(value)))
+
+    def value(self, key, compute):
+        """
+        Return a cached value, computing and storing it if missing.
+
+        Parameters:
+            key (str): The key of the value.
+            compute (callable): Computes the JSON-serializable value when it is not cached.
+
+        Returns:
+            The value.
+        """
+        value = self.get_value(key)
+        if value is None:
+            value = compute()
+            self.store_value(key, value)
+        return value
@@ -0,0 +1,112 @@
+import numpy as np
+from scipy.stats import chi2, chi2_contingency, kstwo, norm
+
+
+class QualityAccumulator:
+    """
+    Streaming statistical-quality tests of a sequence of uniform draws.
+
+    The draws are fed in chunks of any size and only folded into fixed-size
+    accumulators, so memory stays bounded however long the sequence is:
+
+    - a bins x bins histogram of non-overlapping pairs (u_2i, u_2i+1), for a
+      chi-square test of uniformity over the unit square and a contingency
+      test of independence between the two members of each pair;
+    - a ks_bins histogram of the draws, from which the Kolmogorov-Smirnov
+      distance to the uniform distribution is read off at the bin edges
+      (exact there, so it can only underestimate the full distance, by at
+      most the largest deviation inside one bin of width 1 / ks_bins);
+    - the running sums behind the lag-1 serial correlation coefficient.
+
+    Parameters:
+        bins (int): The number of bins per axis of the pair histogram.
+        ks_bins (int): The number of bins of the 1-D histogram.
+    """
+
+    def __init__(self, bins=64, ks_bins=2**16):
+        self.bins = bins
+        self.ks_bins = ks_bins
+        self.pair_counts = np.zeros(bins * bins, dtype=np.int64)
+        self.ks_counts = np.zeros(ks_bins, dtype=np.int64)
+        self.count = 0
+        self.total = 0.0
+        self.total_sq = 0.0
+        self.lag_total = 0.0
+        self.first = None
+        self.last = None
+        self.pending = None  # First member of a pair split across two chunks
+
+    def update(self, draws):
+        """
+        Fold a chunk of draws into the accumulators.
+
+        Parameters:
+            draws (np.ndarray): The next uniform draws of the sequence, in order.
+        """
+        u = np.asarray(draws, dtype=float).ravel()
+        if len(u) == 0:
+            return
+
+        # Running sums for the serial correlation, including the pair across the chunk boundary
+        if self.last is None:
+            self.first = u[0]
+        else:
+            self.lag_total += self.last * u[0]
+        self.lag_total += float(np.dot(u[:-1], u[1:]))
+        self.total += float(u.sum())
+        self.total_sq += float(np.dot(u, u))
+        self.count += len(u)
+        self.last = u[-1]
+
+        # Fine 1-D histogram for the KS distance
+        index = np.minimum((u * self.ks_bins).astype(np.intp), self.ks_bins - 1)
+        self.ks_counts += np.bincount(index, minlength=self.ks_bins)
+
+        # 2-D histogram of non-overlapping pairs, carrying an unpaired draw to the next chunk
+        if self.pending is not None:
+            u = np.concatenate(([self.pending], u))
+        paired = len(u) - len(u) % 2
+        self.pending = u[paired] if paired < len(u) else None
+        cell = np.minimum((u[:paired] * self.bins).astype(np.intp), self.bins - 1)
+        cell = cell[0::2] * self.bins + cell[1::2]
+        self.pair_counts += np.bincount(cell, minlength=self.bins * self.bins)
+
+    def results(self):
+        """
+        Run the tests on everything accumulated so far.
+
+        Returns:
+            dict: Maps each test ('chi2_2d', 'independence', 'ks', 'serial') to its
+                  statistic and p-value.
+        """
+        # Chi-square uniformity over the bins x bins cells
+        observed = self.pair_counts
+        expected = observed.sum() / len(observed)
+        chi2_stat = float(((observed - expected) ** 2).sum() / expected)
+        chi2_p = float(chi2.sf(chi2_stat, len(observed) - 1))
+
+        # Independence of the two members of a pair, given their own marginals
+        table = observed.reshape(self.bins, self.bins)
+        independence_stat, independence_p = chi2_contingency(table, correction=False)[:2]
+
+        # KS distance to the uniform CDF at the bin edges
+        cdf = np.cumsum(self.ks_counts) / self.count
+        edges = np.arange(1, self.ks_bins + 1) / self.ks_bins
+        ks_stat = float(np.abs(cdf - edges).max())
+        ks_p = float(kstwo.sf(ks_stat, self.count))
+
+        # Lag-1 serial correlation (circular, closing the sequence back onto its first draw);
+        # sqrt(n) r is asymptotically standard normal for independent draws
+        n = self.count
+        mean = self.total / n
+        variance = self.total_sq / n - mean * mean
+        lag_mean = (self.lag_total + self.last * self.first) / n
+        serial_r = (lag_mean - mean * mean) / variance
+        serial_p = float(2 * norm.sf(abs(serial_r) * np.sqrt(n)))
+
+        return {
+            'chi2_2d': (chi2_stat, chi2_p),
+            'independence': (float(independence_stat), float(independence_p)),
+            'ks': (ks_stat, ks_p),
+            'serial': (float(serial_r), serial_p),
+        }
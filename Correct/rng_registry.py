@@ -0,0 +1,134 @@
+import importlib
+import importlib.util
+import random
+import warnings
+from functools import partial
+
+import numpy as np
+
+# Each factory builds its generator once from a SeedSequence and returns a
+# function drawing an array of uniform values in [0, 1) of the requested size.
+# Optional backends are imported inside the factories, so a backend is only
+# ever loaded in the process that actually draws from it.
+
+
+def _seed_int(seed_seq):
+    # One 64-bit integer seed for the libraries that do not take a SeedSequence
+    return int(seed_seq.generate_state(1, np.uint64)[0])
+
+
+def _bytes_to_uniform(buffer):
+    # 53 random bits per draw from each 8 random bytes
+    raw = np.frombuffer(buffer, dtype=np.uint64)
+    return (raw >> np.uint64(11)) * 2.0**-53
+
+
+def python_random(seed_seq):
+    # Python's random module (MT19937), all draws of a chunk from one getrandbits call
+    rng = random.Random(_seed_int(seed_seq))
+    return lambda size: _bytes_to_uniform(rng.getrandbits(64 * size).to_bytes(8 * size, 'little'))
+
+
+def numpy_random_state(seed_seq):
+    # NumPy RandomState (legacy)
+    return np.random.RandomState(np.random.MT19937(seed_seq)).random_sample
+
+
+def numpy_generator(bit_generator, seed_seq):
+    # NumPy Generator with the given bit generator class
+    return np.random.Generator(bit_generator(seed_seq)).random
+
+
+def randomgen_generator(bit_generator_name, seed_seq):
+    # NumPy Generator with a bit generator from RandomGen
+    randomgen = importlib.import_module('randomgen')
+    return numpy_generator(getattr(randomgen, bit_generator_name), seed_seq)
+
+
+def pytorch(seed_seq):
+    # PyTorch random number generation
+    torch = importlib.import_module('torch')
+    generator = torch.Generator().manual_seed(_seed_int(seed_seq))
+    return lambda size: torch.rand(size, generator=generator).numpy()
+
+
+def tensorflow(seed_seq):
+    # TensorFlow stateful generator (Philox)
+    tf = importlib.import_module('tensorflow')
+    generator = tf.random.Generator.from_seed(_seed_int(seed_seq) >> 1)
+    return lambda size: generator.uniform([size], dtype=tf.float64).numpy()
+
+
+def crypto(seed_seq):
+    # PyCryptodome's operating-system CSPRNG; it cannot be seeded, so runs are not reproducible
+    get_random_bytes = importlib.import_module('Crypto.Random').get_random_bytes
+    return lambda size: _bytes_to_uniform(get_random_bytes(8 * size))
+
+
+# Registry of the generators: name -> (backend modules it needs, factory)
+GENERATORS = {
+    "Python random": ((), python_random),
+    "NumPy RandomState": ((), numpy_random_state),
+    "PCG64": ((), partial(numpy_generator, np.random.PCG64)),
+    "Philox": ((), partial(numpy_generator, np.random.Philox)),
+    "SFC64": ((), partial(numpy_generator, np.random.SFC64)),
+    "PyTorch": (('torch',), pytorch),
+    "Xoroshiro128": (('randomgen',), partial(randomgen_generator, 'Xoroshiro128')),
+    "JSF": (('randomgen',), partial(randomgen_generator, 'JSF')),
+    "TensorFlow": (('tensorflow',), tensorflow),
+    "PyCryptodome": (('Crypto',), crypto),
+}
+
+
+def register_generator(name, factory, backends=()):
+    """
+    Add a generator to the registry.
+
+    Parameters:
+        name (str): The name of the generator.
+        factory (callable): Picklable factory(seed_seq) returning draw(size).
+        backends (tuple of str): The optional modules the factory imports.
+    """
+    GENERATORS[name] = (tuple(backends), factory)
+
+
+def backend_available(module_name):
+    """
+    Check whether a module can be imported, without importing it.
+
+    Parameters:
+        module_name (str): The name of the module.
+
+    Returns:
+        bool: Whether the module is installed.
+    """
+    try:
+        return importlib.util.find_spec(module_name) is not None
+    except (ImportError, ValueError):
+        return False
+
+
+def select_generators(names=None):
+    """
+    Pick generators from the registry, skipping those whose backends are missing.
+
+    Nothing is imported here: the backends are only located, and imported
+    by the factories once a generator is built.
+
+    Parameters:
+        names (list of str): The generators to select (all registered ones if None).
+
+    Returns:
+        dict: Maps the names of the available generators to their factories.
+    """
+    if names is None:
+        names = list(GENERATORS)
+    selected = {}
+    for name in names:
+        backends, factory = GENERATORS[name]
+        missing = [module for module in backends if not backend_available(module)]
+        if missing:
+            warnings.warn(f"Skipping generator {name!r}: {', '.join(missing)} not installed")
+            continue
+        selected[name] = factory
+    return selected
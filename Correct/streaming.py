@@ -0,0 +1,56 @@
+import numpy as np
+
+from bisector_kernels import DEFAULT_CHUNK_SIZE, ChunkBuffers, folded_bottom_side_hits
+
+
+def stream_hit_count(num_points, rng=None, chunk_size=DEFAULT_CHUNK_SIZE,
+                     kernel=folded_bottom_side_hits, buffers=None):
+    """
+    Count bisector hits over num_points blue/red pairs, one chunk at a time.
+
+    Only one chunk of points is ever alive, so peak memory is O(chunk_size)
+    whatever num_points is. Passing the same buffers to repeated calls avoids
+    reallocating them as well.
+
+    Parameters:
+        num_points (int): The total number of pairs to simulate.
+        rng (np.random.Generator): The generator to draw from (a fresh default one if None).
+        chunk_size (int): The number of pairs per chunk when buffers is None.
+        kernel (callable): Kernel counting hits in the first n columns of the buffers.
+        buffers (ChunkBuffers): Scratch buffers to reuse across calls.
+
+    Returns:
+        int: The number of pairs whose bisector crosses the closest side.
+    """
+    if rng is None:
+        rng = np.random.default_rng()
+    if buffers is None:
+        buffers = ChunkBuffers(max(1, min(chunk_size, num_points)))
+
+    # Keep a running hit count over the chunks
+    hits = 0
+    for start in range(0, num_points, buffers.chunk_size):
+        n = min(buffers.chunk_size, num_points - start)
+        buffers.fill(rng, n)
+        hits += kernel(buffers, n)
+    return hits
+
+
+def estimate_probability_streaming(num_points, rng=None, chunk_size=DEFAULT_CHUNK_SIZE,
+                                   kernel=folded_bottom_side_hits, buffers=None):
+    """
+    Estimate the probability that the perpendicular bisector of a random
+    blue/red pair crosses the side of the unit square closest to blue.
+
+    Parameters:
+        num_points (int): The total number of pairs to simulate.
+        rng (np.random.Generator): The generator to draw from (a fresh default one if None).
+        chunk_size (int): The number of pairs per chunk when buffers is None.
+        kernel (callable): Kernel counting hits in the first n columns of the buffers.
+        buffers (ChunkBuffers): Scratch buffers to reuse across calls.
+
+    Returns:
+        float: The fraction of pairs whose bisector crosses the closest side.
+    """
+    hits = stream_hit_count(num_points, rng, chunk_size, kernel, buffers)
+    return hits / num_points
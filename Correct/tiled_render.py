@@ -0,0 +1,141 @@
+import math
+from collections import OrderedDict
+
+import numpy as np
+
+
+def _circle_crosses_tile(center_x, radius, x0, x1, y0, y1):
+    # The circle (centred on y = 0) passes through the tile when the tile has
+    # points both closer and farther from its centre than the radius
+    nearest = math.hypot(min(max(center_x, x0), x1) - center_x, min(max(0, y0), y1))
+    farthest = math.hypot(max(abs(x0 - center_x), abs(x1 - center_x)), max(abs(y0), abs(y1)))
+    return nearest < radius < farthest
+
+
+class TiledFeasibleRenderer:
+    """
+    Viewport-aware heatmap of the feasible region of a blue point.
+
+    Only the visible extent of the axes is rendered, on a quadtree of square
+    tiles: at level L a tile spans base_size / 2**L, and each view uses the
+    coarsest level that still gives every screen pixel at least one grid
+    point. The region is bounded by the two circles through blue centred at
+    (0, 0) and (1, 0), so a tile that neither circle crosses is uniform and is
+    filled from a single evaluation at its centre; only the tiles along the
+    arcs are evaluated point by point. Tiles are cached (least recently used
+    first out) across zoom and pan events, so returning to a view or panning
+    by part of a tile reuses the work already done. A zoom or pan changes
+    both limits one after the other, so the view is rendered once, from an
+    idle callback after both have changed, and only if it differs from the
+    view last rendered.
+
+    Parameters:
+        ax (matplotlib.axes.Axes): The axes to draw in.
+        tile_resolution (int): The number of grid points along each side of a tile.
+        base_size (float): The side of a level-0 tile.
+        cache_size (int): The number of tiles kept in the cache.
+        **imshow_kwargs: Passed on to ax.imshow (e.g. cmap, alpha).
+    """
+
+    def __init__(self, ax, tile_resolution=128, base_size=3.0, cache_size=1024, **imshow_kwargs):
+        self.ax = ax
+        self.tile_resolution = tile_resolution
+        self.base_size = base_size
+        self.cache_size = cache_size
+        self.blue = None
+        self.tiles = OrderedDict()
+        self.rendered_view = None
+        self.render_timer = None
+
+        # Drawing the image must not move the view, which would trigger another render
+        limits = ax.get_xlim(), ax.get_ylim()
+        self.image = ax.imshow(np.zeros((1, 1), dtype=bool), origin='lower', vmin=0, vmax=1, **imshow_kwargs)
+        ax.set_autoscale_on(False)
+        ax.set_xlim(*limits[0])
+        ax.set_ylim(*limits[1])
+
+        ax.callbacks.connect('xlim_changed', self._on_view_changed)
+        ax.callbacks.connect('ylim_changed', self._on_view_changed)
+
+    def set_blue(self, blue_x, blue_y):
+        """
+        Move the blue point and re-render the visible region.
+
+        Parameters:
+            blue_x (float): The x coordinate of the blue point.
+            blue_y (float): The y coordinate of the blue point.
+        """
+        self.blue = (float(blue_x), float(blue_y))
+        self.render()
+
+    def _on_view_changed(self, ax):
+        # Defer to a single render once the event loop is idle, however many limits changed
+        if self.blue is None or self.render_timer is not None:
+            return
+        self.render_timer = self.ax.figure.canvas.new_timer(interval=0)
+        self.render_timer.single_shot = True
+        self.render_timer.add_callback(self._render_pending)
+        self.render_timer.start()
+
+    def _render_pending(self):
+        self.render_timer = None
+        self.render()
+
+    def _level(self, x0, x1, y0, y1):
+        # Coarsest level with at least one grid point per screen pixel in both directions
+        window = self.ax.get_window_extent()
+        points_per_unit = max(window.width / (x1 - x0), window.height / (y1 - y0), 1e-12)
+        return math.ceil(math.log2(points_per_unit * self.base_size / self.tile_resolution))
+
+    def _tile(self, level, i, j):
+        key = (self.blue, level, i, j)
+        if key in self.tiles:
+            self.tiles.move_to_end(key)
+            return self.tiles[key]
+
+        blue_x, blue_y = self.blue
+        size = self.base_size / 2.0**level
+        x0, y0 = i * size, j * size
+        sq_radius_1 = blue_x**2 + blue_y**2
+        sq_radius_2 = (1 - blue_x)**2 + blue_y**2
+
+        if (_circle_crosses_tile(0, math.sqrt(sq_radius_1), x0, x0 + size, y0, y0 + size)
+                or _circle_crosses_tile(1, math.sqrt(sq_radius_2), x0, x0 + size, y0, y0 + size)):
+            # Boundary tile: evaluate every grid point at the centre of its pixel
+            offsets = (np.arange(self.tile_resolution) + 0.5) * (size / self.tile_resolution)
+            X, Y = np.meshgrid(x0 + offsets, y0 + offsets)
+            sq_dist_1 = X**2 + Y**2
+            tile = (sq_dist_1 - sq_radius_1) * (sq_dist_1 - 2 * X + 1 - sq_radius_2) <= 0
+        else:
+            # Uniform tile: one evaluation at its centre decides every point
+            cx, cy = x0 + size / 2, y0 + size / 2
+            sq_dist_1 = cx**2 + cy**2
+            tile = (sq_dist_1 - sq_radius_1) * (sq_dist_1 - 2 * cx + 1 - sq_radius_2) <= 0
+
+        self.tiles[key] = tile
+        if len(self.tiles) > self.cache_size:
+            self.tiles.popitem(last=False)
+        return tile
+
+    def render(self):
+        """Compose the visible tiles into the image and request a redraw."""
+        x0, x1 = sorted(self.ax.get_xlim())
+        y0, y1 = sorted(self.ax.get_ylim())
+        level = self._level(x0, x1, y0, y1)
+        view_key = (self.blue, x0, x1, y0, y1, level)
+        if view_key == self.rendered_view:
+            return
+        self.rendered_view = view_key
+        size = self.base_size / 2.0**level
+        i0, i1 = math.floor(x0 / size), math.ceil(x1 / size)
+        j0, j1 = math.floor(y0 / size), math.ceil(y1 / size)
+
+        res = self.tile_resolution
+        view = np.empty(((j1 - j0) * res, (i1 - i0) * res), dtype=bool)
+        for j in range(j0, j1):
+            for i in range(i0, i1):
+                view[(j - j0) * res:(j - j0 + 1) * res, (i - i0) * res:(i - i0 + 1) * res] = self._tile(level, i, j)
+
+        self.image.set_data(view)
+        self.image.set_extent((i0 * size, i1 * size, j0 * size, j1 * size))
+        self.ax.figure.canvas.draw_idle()
@@ -0,0 +1,73 @@
+import numpy as np
+
+from bisector_kernels import DEFAULT_CHUNK_SIZE
+
+
+def fold_into_triangle(x, y):
+    """
+    Fold points of the unit square in place into the triangle y < x, y < 1 - x.
+
+    The two diagonals cut the square into four congruent triangles. Swapping
+    x and y (a reflection across y = x) sends the left and top ones onto the
+    bottom and right ones, and reflecting across y = 1 - x then sends the
+    right one onto the bottom one. Each piece is moved rigidly, so uniform
+    points in the square become uniform points in the triangle, one for one.
+
+    Parameters:
+        x (np.ndarray): The x coordinates, overwritten with the folded ones.
+        y (np.ndarray): The y coordinates, overwritten with the folded ones.
+
+    Returns:
+        tuple of np.ndarray: x and y.
+    """
+    # Reflect across y = x: the larger coordinate becomes x
+    smaller = np.minimum(x, y)
+    np.maximum(x, y, out=x)
+    y[...] = smaller
+
+    # Reflect across y = 1 - x where the point is above it: (x, y) -> (1 - y, 1 - x)
+    above = x + y > 1
+    x[above], y[above] = 1 - y[above], 1 - x[above]
+    return x, y
+
+
+def iter_bounded_chunks(generator, z, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Yield z uniform points of the triangle y < x, y < 1 - x, one chunk at a time.
+
+    Every point costs exactly two draws, so no draws are rejected and only
+    one chunk of points is alive at a time.
+
+    Parameters:
+        generator (callable): Returns an array of the given size of uniform draws in [0, 1).
+        z (int): The total number of points.
+        chunk_size (int): The number of points per chunk.
+
+    Yields:
+        tuple: The index of the first point of the chunk, and its x and y coordinates.
+    """
+    for start in range(0, z, chunk_size):
+        n = min(chunk_size, z - start)
+        x = np.asarray(generator(n), dtype=float)
+        y = np.asarray(generator(n), dtype=float)
+        yield (start,) + fold_into_triangle(x, y)
+
+
+def generate_bounded_points(generator, z, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Generate z uniform points of the triangle y < x, y < 1 - x.
+
+    Parameters:
+        generator (callable): Returns an array of the given size of uniform draws in [0, 1).
+        z (int): The number of points.
+        chunk_size (int): The number of points drawn at once.
+
+    Returns:
+        tuple of np.ndarray: The x and y coordinates.
+    """
+    x_bounded = np.empty(z)
+    y_bounded = np.empty(z)
+    for start, x, y in iter_bounded_chunks(generator, z, chunk_size):
+        x_bounded[start:start + len(x)] = x
+        y_bounded[start:start + len(y)] = y
+    return x_bounded, y_bounded
@@ -0,0 +1,282 @@
+import numpy as np
+
+from bisector_kernels import DEFAULT_CHUNK_SIZE
+from circle_areas import circle_square_areas
+from triangle_sampling import fold_into_triangle
+
+# Every estimator below draws blue in the triangle y < x, y < 1 - x (whose
+# closest side is y = 0, see folded_bottom_side_hits) and red in the unit
+# square, and returns (estimate, standard error, variance-reduction factor, number
+# of bisector tests), the last being the tests it actually drew, which may differ
+# a little from the budget asked for.
+# The factor is the variance of plain Monte Carlo with the same number of
+# bisector tests, p (1 - p) / n, divided by the variance of the estimator,
+# so it is the factor by which the number of samples needed for a given
+# precision shrinks (NaN when a tiny sample shows no variance at all).
+
+
+def bottom_side_hits(blue_x, blue_y, red_x, red_y):
+    """
+    Test whether the perpendicular bisector crosses y = 0 between x = 0 and x = 1.
+
+    With f(P) = |P - B|^2 - |P - R|^2 it does exactly when f(0, 0) and
+    f(1, 0) = f(0, 0) + 2 (Rx - Bx) do not share a sign.
+
+    Parameters:
+        blue_x, blue_y (np.ndarray): The blue points.
+        red_x, red_y (np.ndarray): The red points.
+
+    Returns:
+        np.ndarray: The hit indicator of every pair, as floats.
+    """
+    f_00 = (blue_x * blue_x + blue_y * blue_y) - (red_x * red_x + red_y * red_y)
+    return (f_00 * (f_00 + 2 * (red_x - blue_x)) <= 0).astype(float)
+
+
+def _summary(mean, variance, num_tests):
+    # Estimate, standard error, variance-reduction factor against plain Monte Carlo and the
+    # number of tests; a sample too small to show any variance (or rounding below 0) leaves
+    # the factor unknown
+    plain_variance = mean * (1 - mean) / num_tests
+    variance = max(variance, 0.0)
+    factor = plain_variance / variance if variance > 0 else np.nan
+    return mean, np.sqrt(variance), factor, int(num_tests)
+
+
+def triangle_cells(k):
+    """
+    Split the triangle y < x, y < 1 - x into k^2 congruent cells.
+
+    With A = (0, 0), B = (1, 0) and C = (1/2, 1/2), cell (i, j, s) is the
+    triangle with vertices A + ((i, j) + s (u, v)) / k in the (B - A, C - A)
+    frame for (u, v) in the unit simplex: s = 1 for the k (k + 1) / 2 cells
+    pointing like the triangle and s = -1 for the k (k - 1) / 2 upside-down
+    ones, anchored at their opposite corner.
+
+    Parameters:
+        k (int): The number of cells along each side.
+
+    Returns:
+        np.ndarray: The (i, j, s) of every cell, shape (k^2, 3).
+    """
+    upright = [(i, j, 1) for i in range(k) for j in range(k - i)]
+    flipped = [(i + 1, j + 1, -1) for i in range(k - 1) for j in range(k - 1 - i)]
+    return np.array(upright + flipped, dtype=float)
+
+
+def _stratum_hits(cells, k, red_grid, counts, rng, chunk_size):
+    # Hits of counts[h] uniform pairs in every stratum h, chunk by chunk over the pairs in
+    # stratum order; stratum h pairs blue cell h // red_grid^2 with red cell h % red_grid^2
+    bounds = np.cumsum(counts)
+    hits = np.zeros(len(counts))
+    for start in range(0, int(bounds[-1]), chunk_size):
+        stratum = np.searchsorted(bounds, np.arange(start, min(start + chunk_size, bounds[-1])), side='right')
+        n = len(stratum)
+        i, j, s = cells[stratum // red_grid**2].T
+        red_cell = stratum % red_grid**2
+
+        # Blue in its cell, folding the unit square onto the unit simplex
+        u, v = rng.random(n), rng.random(n)
+        outside = u + v > 1
+        u[outside], v[outside] = 1 - u[outside], 1 - v[outside]
+        a = (i + s * u) / k
+        b = (j + s * v) / k
+
+        # Red in its square cell
+        red_x = (red_cell // red_grid + rng.random(n)) / red_grid
+        red_y = (red_cell % red_grid + rng.random(n)) / red_grid
+        hits += np.bincount(stratum, bottom_side_hits(a + b / 2, b / 2, red_x, red_y), minlength=len(counts))
+    return hits
+
+
+def stratified_estimate(num_points, rng=None, k=8, red_grid=8, pilot_fraction=0.1,
+                        chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Stratify blue over the cells of the triangle and red over a grid of the
+    square, with Neyman allocation.
+
+    The strata pair each of the k^2 equal-area cells of triangle_cells with
+    each of the red_grid^2 cells of the square. Blue alone gains almost
+    nothing: the feasible area varies little with blue, and nearly all the
+    variance is whether red lands in it. Stratifying red as well confines it
+    to the strata the circle arcs cross, where Neyman allocation then puts
+    most of the pairs. A pilot run spends pilot_fraction of the budget evenly
+    to estimate the standard deviation sqrt(p_h (1 - p_h)) of the hit
+    indicator in each stratum, and the rest goes to the strata in proportion
+    to it (they have equal weights). The standard error is reliable once
+    the pilot draws a few tens of pairs per stratum.
+
+    Parameters:
+        num_points (int): The total number of blue/red pairs.
+        rng (np.random.Generator): The generator to draw from (a fresh default one if None).
+        k (int): The number of blue cells along each side of the triangle.
+        red_grid (int): The number of red cells along each side of the square.
+        pilot_fraction (float): The share of the pairs spent on the pilot run.
+        chunk_size (int): The largest number of pairs drawn at once.
+
+    Returns:
+        tuple: The estimate, its standard error, the variance-reduction factor and the
+            number of pairs drawn (the pilot takes at least 2 per stratum and the
+            allocation rounds down, so this is not exactly num_points).
+    """
+    if rng is None:
+        rng = np.random.default_rng()
+    cells = triangle_cells(k)
+    num_strata = len(cells) * red_grid**2
+
+    # Pilot run, the same number of pairs in every stratum
+    pilot = max(2, int(num_points * pilot_fraction) // num_strata)
+    counts = np.full(num_strata, pilot)
+    hits = _stratum_hits(cells, k, red_grid, counts, rng, chunk_size)
+
+    # Neyman allocation of the rest, keeping the strata the pilot found constant alive
+    p_strata = hits / counts
+    sigma = np.sqrt(np.clip(p_strata * (1 - p_strata), 1 / pilot, None))
+    remaining = max(num_points - counts.sum(), 0)
+    allocation = np.floor(remaining * sigma / sigma.sum()).astype(int)
+    hits += _stratum_hits(cells, k, red_grid, allocation, rng, chunk_size)
+    counts += allocation
+
+    p_strata = hits / counts
+    mean = p_strata.mean()
+    variance = (p_strata * (1 - p_strata) / counts).sum() / num_strata**2
+    return _summary(mean, variance, counts.sum())
+
+
+def antithetic_estimate(num_points, rng=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Pair every red point with its reflection through the centre of the square.
+
+    R and (1 - Rx, 1 - Ry) are equally likely, but a red point that makes the
+    bisector hit y = 0 tends to have a reflection that does not, so the two
+    indicators are negatively correlated (about -0.65) and their average
+    varies much less than either.
+
+    Parameters:
+        num_points (int): The total number of bisector tests (two per blue point, at least 4).
+        rng (np.random.Generator): The generator to draw from (a fresh default one if None).
+        chunk_size (int): The largest number of antithetic pairs drawn at once.
+
+    Returns:
+        tuple: The estimate, its standard error, the variance-reduction factor and the
+            number of bisector tests (num_points rounded down to an even number).
+    """
+    if num_points < 4:
+        raise ValueError(f"The antithetic estimate needs at least 4 bisector tests, got {num_points}")
+    if rng is None:
+        rng = np.random.default_rng()
+    num_pairs = num_points // 2
+
+    total = 0.0
+    total_sq = 0.0
+    for start in range(0, num_pairs, chunk_size):
+        n = min(chunk_size, num_pairs - start)
+        blue_x, blue_y = fold_into_triangle(rng.random(n), rng.random(n))
+        red_x, red_y = rng.random(n), rng.random(n)
+        average = (bottom_side_hits(blue_x, blue_y, red_x, red_y)
+                   + bottom_side_hits(blue_x, blue_y, 1 - red_x, 1 - red_y)) / 2
+        total += average.sum()
+        total_sq += (average * average).sum()
+
+    mean = total / num_pairs
+    variance = (total_sq / num_pairs - mean * mean) / num_pairs
+    return _summary(mean, variance, 2 * num_pairs)
+
+
+def control_variate_estimate(num_points, rng=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Use red's membership of the two circles through blue as control variates.
+
+    A pair hits exactly when red lies inside one of the circles through blue
+    centred at (0, 0) and (1, 0) but not the other. The indicators of red
+    lying inside each circle have the exactly known conditional means
+    area_1(B) and area_2(B) (circle_areas.circle_square_areas), so
+    I - beta . (C - area(B)) is unbiased for any beta; beta is fitted by
+    least squares on the same samples, which is the optimal choice up to an
+    O(1 / n) bias. When the sampled controls are collinear (in a tiny sample)
+    the minimum-norm least-squares beta is used.
+
+    Parameters:
+        num_points (int): The total number of blue/red pairs (at least 3).
+        rng (np.random.Generator): The generator to draw from (a fresh default one if None).
+        chunk_size (int): The largest number of pairs drawn at once.
+
+    Returns:
+        tuple: The estimate, its standard error, the variance-reduction factor and the
+            number of pairs.
+    """
+    if num_points < 3:
+        raise ValueError(f"The control-variate estimate needs at least 3 pairs, got {num_points}")
+    if rng is None:
+        rng = np.random.default_rng()
+
+    # Running sums of the hit indicator y and the centred controls x for the regression
+    sum_y = 0.0
+    sum_yy = 0.0
+    sum_x = np.zeros(2)
+    sum_xy = np.zeros(2)
+    sum_xx = np.zeros((2, 2))
+    for start in range(0, num_points, chunk_size):
+        n = min(chunk_size, num_points - start)
+        blue_x, blue_y = fold_into_triangle(rng.random(n), rng.random(n))
+        red_x, red_y = rng.random(n), rng.random(n)
+        hits = bottom_side_hits(blue_x, blue_y, red_x, red_y)
+
+        area_1, area_2, _ = circle_square_areas(blue_x, blue_y)
+        sq_radius = blue_x * blue_x + blue_y * blue_y
+        sq_dist = red_x * red_x + red_y * red_y
+        controls = np.stack([(sq_dist <= sq_radius) - area_1,
+                             (sq_dist - 2 * red_x <= sq_radius - 2 * blue_x) - area_2])
+
+        sum_y += hits.sum()
+        sum_yy += hits @ hits
+        sum_x += controls.sum(axis=1)
+        sum_xy += controls @ hits
+        sum_xx += controls @ controls.T
+
+    # Least-squares coefficients and the variance of the residual
+    mean_y = sum_y / num_points
+    mean_x = sum_x / num_points
+    cov_xx = sum_xx / num_points - np.outer(mean_x, mean_x)
+    cov_xy = sum_xy / num_points - mean_x * mean_y
+    beta = np.linalg.lstsq(cov_xx, cov_xy, rcond=None)[0]
+    residual_variance = sum_yy / num_points - mean_y * mean_y - cov_xy @ beta
+
+    mean = mean_y - beta @ mean_x
+    return _summary(mean, residual_variance / num_points, num_points)
+
+
+# Selectable variance-reduction strategies
+STRATEGIES = {
+    'stratified': stratified_estimate,
+    'antithetic': antithetic_estimate,
+    'control_variate': control_variate_estimate,
+}
+
+
+def estimate_with_variance_reduction(num_points, strategy, rng=None, **kwargs):
+    """
+    Estimate the probability with one of the variance-reduction strategies.
+
+    Parameters:
+        num_points (int): The number of bisector tests to spend.
+        strategy (str): 'stratified', 'antithetic' or 'control_variate'.
+        rng (np.random.Generator): The generator to draw from (a fresh default one if None).
+        **kwargs: Passed on to the strategy.
+
+    Returns:
+        tuple: The estimate, its standard error, the variance-reduction factor and the
+            number of bisector tests drawn.
+    """
+    if strategy not in STRATEGIES:
+        raise ValueError(f"Unknown variance-reduction strategy: {strategy!r}")
+    return STRATEGIES[strategy](num_points, rng, **kwargs)
+
+
+if __name__ == "__main__":
+    num_points = 10_000_000
+    rng = np.random.default_rng()
+    for strategy in STRATEGIES:
+        estimate, standard_error, factor, num_tests = estimate_with_variance_reduction(num_points, strategy, rng)
+        print(f"{strategy}: Probability = {estimate:.7f} +- {standard_error:.1e}, "
+              f"Variance reduction factor = {factor:.2f}, Tests = {num_tests}")
@@ -0,0 +1,287 @@
+import importlib.util
+import itertools
+import math
+import os
+from collections import namedtuple
+from fractions import Fraction
+from functools import partial
+
+import numpy as np
+
+from batch_verify import exact_intersection
+from bisector_kernels import ChunkBuffers, closest_side_hits, folded_bottom_side_hits
+from circle_areas import estimate_probability_conditional, feasible_area
+from compiled_kernels import compiled_hit_count
+from cubature import adaptive_integrate_triangle
+from integer_kernels import LatticeBuffers, lattice_folded_hits, lattice_hit_count
+from streaming import stream_hit_count
+
+# Outcome of a sequential test: 'pass' (consistent with the reference), 'fail' (biased by at
+# least delta) or 'undecided' (budget exhausted), with the running estimate and sample count
+SPRTResult = namedtuple('SPRTResult', ['decision', 'estimate', 'num_points', 'reference'])
+
+# The probability to 30 digits, from the nested mpmath quadrature of the closed-form integrand of
+# New Integral attempt.py at mp.dps = 30 (compute_integral, several minutes); it shares no code
+# with the feasible-area cubature, so the deterministic integrals are checked against it
+MPMATH_REFERENCE = '0.491407578838307988174235210304'
+
+
+def reference_probability(tol=1e-14):
+    """
+    High-precision reference value of the probability.
+
+    This is 8 times the integral of the exact feasible area over the triangle
+    0 <= y <= x <= 1/2, which agrees with the 30-digit mpmath integral of New
+    Integral attempt.py to 1e-16.
+
+    Parameters:
+        tol (float): The target absolute error of the integral.
+
+    Returns:
+        float: The reference probability.
+    """
+    value, _ = adaptive_integrate_triangle(lambda y, x: feasible_area(x, y), x_max=0.5, tol=tol / 8)
+    return 8 * value
+
+
+def _thresholds(alpha, beta):
+    # Wald's bounds on the log-likelihood ratio: reject H0 above the first, accept it below the second
+    return math.log((1 - beta) / alpha), math.log(beta / (1 - alpha))
+
+
+def _sequential_test(llr_increments, reference, delta, alpha, beta, max_points):
+    # Two one-sided SPRTs, H0: p = reference against H1: p = reference +- delta; the method
+    # fails as soon as either rejects H0 and passes once both have accepted it
+    upper, lower = _thresholds(alpha, beta)
+    llr = np.zeros(2)
+    accepted = np.zeros(2, dtype=bool)
+    total = 0.0
+    num_points = 0
+    for batch_llr, batch_total, batch_points in llr_increments:
+        llr += np.where(accepted, 0, batch_llr)
+        total += batch_total
+        num_points += batch_points
+        estimate = total / num_points
+        if (llr >= upper).any():
+            return SPRTResult('fail', estimate, num_points, reference)
+        accepted |= llr <= lower
+        if accepted.all():
+            return SPRTResult('pass', estimate, num_points, reference)
+        if num_points >= max_points:
+            return SPRTResult('undecided', estimate, num_points, reference)
+
+
+def sprt_binomial(count_fn, reference=None, delta=2e-3, alpha=1e-4, beta=1e-4, batch_size=100_000,
+                  max_points=100_000_000, rng=None):
+    """
+    Sequentially test whether a Monte Carlo hit counter is unbiased.
+
+    Batches of pairs are counted by count_fn and the exact binomial
+    log-likelihood ratios of p = reference + delta and p = reference - delta
+    against p = reference are accumulated until Wald's thresholds decide. A
+    method biased by delta is flagged with probability 1 - beta, a correct
+    one with probability at most alpha. Wald's expected sample size for a
+    correct method is about log(1 / beta) * 2 p (1 - p) / delta**2, some
+    1.2 million pairs for the defaults; a bias of a few percent, like those
+    of the methods in Wrong/, is flagged after the first batch.
+
+    Parameters:
+        count_fn (callable): count_fn(num_points, rng) returning a hit count.
+        reference (float): The true probability (reference_probability() if None).
+        delta (float): The smallest bias to detect.
+        alpha (float): The probability of flagging a correct method.
+        beta (float): The probability of passing a method biased by delta.
+        batch_size (int): The number of pairs per batch.
+        max_points (int): The sample budget.
+        rng (np.random.Generator): The generator to draw from (a fresh default one if None).
+
+    Returns:
+        SPRTResult: The decision, the estimate and the number of pairs used.
+    """
+    if reference is None:
+        reference = reference_probability()
+    if rng is None:
+        rng = np.random.default_rng()
+    alternatives = np.array([reference + delta, reference - delta])
+
+    def increments():
+        while True:
+            hits = count_fn(batch_size, rng)
+            llr = (hits * np.log(alternatives / reference)
+                   + (batch_size - hits) * np.log((1 - alternatives) / (1 - reference)))
+            yield llr, hits, batch_size
+
+    return _sequential_test(increments(), reference, delta, alpha, beta, max_points)
+
+
+def sprt_gaussian(estimate_fn, reference=None, delta=2e-3, alpha=1e-4, beta=1e-4, batch_size=100_000,
+                  max_points=100_000_000, rng=None):
+    """
+    Sequentially test whether an estimator with a standard error is unbiased.
+
+    Like sprt_binomial, for estimators whose batches are not plain hit counts
+    (conditional or variance-reduced ones): each batch estimate is treated as
+    normal with its reported standard error, so the test also checks that
+    the standard errors are not too small.
+
+    Parameters:
+        estimate_fn (callable): estimate_fn(num_points, rng) returning (estimate, standard error).
+        reference (float): The true probability (reference_probability() if None).
+        delta (float): The smallest bias to detect.
+        alpha (float): The probability of flagging a correct method.
+        beta (float): The probability of passing a method biased by delta.
+        batch_size (int): The number of samples per batch.
+        max_points (int): The sample budget.
+        rng (np.random.Generator): The generator to draw from (a fresh default one if None).
+
+    Returns:
+        SPRTResult: The decision, the estimate and the number of samples used.
+    """
+    if reference is None:
+        reference = reference_probability()
+    if rng is None:
+        rng = np.random.default_rng()
+    alternatives = np.array([reference + delta, reference - delta])
+
+    def increments():
+        while True:
+            value, standard_error = estimate_fn(batch_size, rng)[:2]
+            llr = ((value - reference) ** 2 - (value - alternatives) ** 2) / (2 * standard_error ** 2)
+            yield llr, value * batch_size, batch_size
+
+    return _sequential_test(increments(), reference, delta, alpha, beta, max_points)
+
+
+def grid_pairs(k):
+    """
+    Every blue/red pair of a tiny lattice, with the degenerate ones removed.
+
+    The lattice points are the centres (2i + 1) / (2k) of a k x k grid of
+    cells; with k a power of 2 they and all the kernels' intermediate sums
+    and products are exact in float64. Only two kinds of pairs are dropped:
+    red on blue, which has no bisector, and blue on a diagonal of the
+    square, which is equally close to two sides, so that any choice of
+    side is as good as another. Bisectors through a corner of the closest
+    side are kept: the exact logic counts them as hits, and so must the
+    kernels.
+
+    Parameters:
+        k (int): The number of lattice points along each axis.
+
+    Returns:
+        tuple of np.ndarray: The blue and red points, shape (n, 2) each.
+    """
+    points = (2 * np.array(list(itertools.product(range(k), repeat=2))) + 1) / (2 * k)
+    blue = np.repeat(points, len(points), axis=0)
+    red = np.tile(points, (len(points), 1))
+    diagonal = np.abs(blue[:, 0] - 0.5) == np.abs(blue[:, 1] - 0.5)
+    keep = ~diagonal & (blue != red).any(axis=1)
+    return blue[keep], red[keep]
+
+
+def grid_check(kernel, k=8):
+    """
+    Compare a chunk kernel with the exact Fraction logic on every pair of a tiny lattice.
+
+    Parameters:
+        kernel (callable): Kernel counting hits in the first n columns of ChunkBuffers.
+        k (int): The number of lattice points along each axis (a power of 2).
+
+    Returns:
+        tuple of int: The kernel's hit count, the exact one and the number of pairs.
+    """
+    blue, red = grid_pairs(k)
+    exact_hits = sum(exact_intersection([Fraction(c) for c in b], [Fraction(c) for c in r])
+                     for b, r in zip(blue, red))
+    buffers = ChunkBuffers(len(blue))
+    buffers.coords[:] = np.concatenate([blue.T, red.T])
+    return kernel(buffers, len(blue)), exact_hits, len(blue)
+
+
+def lattice_grid_check(k=8):
+    """
+    grid_check for the exact integer kernel, on the same lattice.
+
+    grid_pairs drops blue on a diagonal, where the kernel and the Fraction
+    logic may pick different equally close sides; the corner ties it keeps
+    are decided alike.
+
+    Parameters:
+        k (int): The number of lattice points along each axis (a power of 2).
+
+    Returns:
+        tuple of int: The kernel's hit count, the exact one and the number of pairs.
+    """
+    blue, red = grid_pairs(k)
+    exact_hits = sum(exact_intersection([Fraction(c) for c in b], [Fraction(c) for c in r])
+                     for b, r in zip(blue, red))
+    # The cell centres (2i + 1) / (2k) are the odd integers 2i + 1 - k of LatticeBuffers
+    buffers = LatticeBuffers(len(blue), bits=k.bit_length() - 1)
+    buffers.coords[:] = np.rint(2 * k * np.concatenate([blue.T, red.T])) - k
+    return lattice_folded_hits(buffers, len(blue)), exact_hits, len(blue)
+
+
+def load_script(path, name):
+    """
+    Import one of the project's scripts (whose file names have spaces) as a module.
+
+    Parameters:
+        path (str): The path of the script.
+        name (str): The module name to give it.
+
+    Returns:
+        module: The imported script; its __main__ block is not run.
+    """
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+if __name__ == "__main__":
+    reference = reference_probability()
+    print(f"Reference probability: {reference:.15f}")
+
+    # Exhaustive exact checks of the kernels on an 8 x 8 lattice
+    for kernel in (closest_side_hits, folded_bottom_side_hits):
+        kernel_hits, exact_hits, num_pairs = grid_check(kernel)
+        status = 'ok' if kernel_hits == exact_hits else 'MISMATCH'
+        print(f"Grid {kernel.__name__}: {kernel_hits} hits, exact {exact_hits} of {num_pairs} pairs: {status}")
+    kernel_hits, exact_hits, num_pairs = lattice_grid_check()
+    status = 'ok' if kernel_hits == exact_hits else 'MISMATCH'
+    print(f"Grid lattice_folded_hits: {kernel_hits} hits, exact {exact_hits} of {num_pairs} pairs: {status}")
+
+    # Sequential tests of the estimators, including the ones in Wrong/
+    wrong_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "Wrong")
+    correct_randomization = load_script(os.path.join(wrong_dir, "Correct Randomization.py"), 'correct_randomization')
+    variance_reduction_mc = load_script(os.path.join(wrong_dir, "Variance Reduction Monte Carlo.py"),
+                                        'variance_reduction_mc')
+    integral_solution = load_script(os.path.join(wrong_dir, "Integral Solution.py"), 'integral_solution')
+
+    binomial_methods = {
+        'closest_side': partial(stream_hit_count, kernel=closest_side_hits),
+        'folded': partial(stream_hit_count, kernel=folded_bottom_side_hits),
+        'compiled': compiled_hit_count,
+        'lattice': lattice_hit_count,
+        'Correct Randomization': correct_randomization.count_bisector_intersections_vectorized,
+        'Variance Reduction Monte Carlo (pseudo-random)': partial(stream_hit_count,
+                                                                  kernel=variance_reduction_mc.bounded_bisector_hits),
+    }
+    for name, count_fn in binomial_methods.items():
+        result = sprt_binomial(count_fn, reference)
+        print(f"SPRT {name}: {result.decision} after {result.num_points} samples (estimate {result.estimate:.6f})")
+
+    result = sprt_gaussian(estimate_probability_conditional, reference)
+    print(f"SPRT conditional: {result.decision} after {result.num_points} samples (estimate {result.estimate:.6f})")
+
+    # The deterministic integrals are compared with the independent mpmath value, to their
+    # error estimates or a few units in the last place of float64
+    mpmath_reference = float(MPMATH_REFERENCE)
+    new_integral_attempt = load_script(os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                                    "New Integral attempt.py"), 'new_integral_attempt')
+    for name, integrate in (('Integral Solution', integral_solution.integrate),
+                            ('New Integral attempt', new_integral_attempt.compute_integral_vectorized)):
+        value, error = integrate()
+        deviation = abs(8 * value - mpmath_reference)
+        status = 'pass' if deviation <= max(8 * error, 1e-15) else 'fail'
+        print(f"{name}: {status} (deviation {deviation:.1e} from the mpmath value)")
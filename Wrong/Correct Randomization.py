@@ -1,23 +1,25 @@
+import os
+import sys
+
 import numpy as np
 
-def simulate_bisector_intersections_vectorized(z):
-    """
-    Simulate z pairs of (x, y) variables, assign one point as the chosen point,
-    and determine whether the perpendicular bisector of the pair intersects
-    the closest side of the unit square to the chosen point.
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "Correct"))
+from adaptive import binomial_interval
+from parallel import parallel_hit_count
 
-    This is the vectorized version for improved performance with large z.
+
+def count_bisector_intersections_vectorized(z, rng):
+    """
+    Count, over z simulated pairs, how often the perpendicular bisector
+    intersects the closest side of the unit square to the chosen point.
 
     Parameters:
         z (int): The number of pairs to simulate.
+        rng (np.random.Generator): The generator to draw the pairs from.
 
     Returns:
-        float: The probability that the perpendicular bisector intersects the
-               closest side to the chosen point.
+        int: The number of pairs whose bisector intersects the closest side.
     """
-    # Initialize the Philox random number generator
-    rng = np.random.Generator(np.random.Philox())
-
     # Generate z pairs of (x, y) points within the unit square [0, 1] x [0, 1]
     xy_pairs = rng.uniform(0, 1, size=(z, 2, 2))  # Shape: (z, 2, 2)
 
@@ -74,13 +76,38 @@ def simulate_bisector_intersections_vectorized(z):
     x_intersect_top = Mx[mask_top] + (D_y[mask_top] * (1 - My[mask_top])) / D_x[mask_top]
     intersects[mask_top] = (x_intersect_top >= 0) & (x_intersect_top <= 1)
 
-    # Calculate the probability over all pairs
-    count_intersect = np.sum(intersects)
+    return int(np.sum(intersects))
+
+
+def simulate_bisector_intersections_vectorized(z, seed=None, workers=1):
+    """
+    Simulate z pairs of (x, y) variables, assign one point as the chosen point,
+    and determine whether the perpendicular bisector of the pair intersects
+    the closest side of the unit square to the chosen point.
+
+    This is the vectorized version for improved performance with large z. The
+    pairs are split into fixed-size tasks, each drawing from its own Philox
+    stream spawned from seed, so the result only depends on seed.
+
+    Parameters:
+        z (int): The number of pairs to simulate.
+        seed (int): The root seed of the Philox streams (fresh entropy if None).
+        workers (int): The number of worker processes to spread the tasks over.
+
+    Returns:
+        tuple: The probability that the perpendicular bisector intersects the
+               closest side to the chosen point, and the number of pairs whose
+               bisector does.
+    """
+    count_intersect = parallel_hit_count(z, seed, workers, task_size=10_000_000,
+                                         count_fn=count_bisector_intersections_vectorized,
+                                         bit_generator=np.random.Philox)
     probability = count_intersect / z
-    return probability
+    return probability, count_intersect
 
 # Example usage:
 if __name__ == "__main__":
     z = 100000000  # Large number of pairs to simulate
-    probability = simulate_bisector_intersections_vectorized(z)
-    print(f"Probability of intersection: {probability}")
+    probability, count_intersect = simulate_bisector_intersections_vectorized(z, workers=os.cpu_count())
+    low, high = binomial_interval(count_intersect, z)
+    print(f"Probability of intersection: {probability}, 99% CI: [{low:.6f}, {high:.6f}]")
@@ -1,51 +1,34 @@
-import mpmath
+import os
+import sys
+import time
 
-mpmath.mp.dps = 15  # Set decimal precision to 15 digits
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "Correct"))
+from circle_areas import feasible_area
+from cubature import adaptive_integrate_triangle
 
-def integrand(x1, y1, x2, y2):
-    if x1 == x2:
-        return mpmath.mpf(0)
-    numerator = (x1**2 - x2**2) + (y1**2 - y2**2)
-    denominator = 2 * (x1 - x2)
-    x = numerator / denominator
-    if 0 <= x <= 1:
-        return mpmath.mpf(1)
-    else:
-        return mpmath.mpf(0)
+# Target absolute error of the outer integral
+tolerance = 1e-14
 
-# Integration limits
-x1_min = mpmath.mpf(0)
-x1_max = mpmath.mpf(0.5)
-y1_min = lambda x1: mpmath.mpf(0)
-y1_max = lambda x1: x1
-x2_min = mpmath.mpf(0)
-x2_max = mpmath.mpf(1)
-y2_min = mpmath.mpf(0)
-y2_max = mpmath.mpf(1)
+# Integration limits of the blue point (x1, y1): 0 <= y1 <= x1 <= 1/2; the red point
+# (x2, y2) ranges over the whole unit square
+x1_max = 0.5
 
-# Integration with manual iteration to minimize nested calls
+# Inner integral over (x2, y2): the indicator that the bisector meets y = 0 at
+# x = ((x1^2 - x2^2) + (y1^2 - y2^2)) / (2 (x1 - x2)) in [0, 1] integrates to the
+# area of the region between the circles through (x1, y1) centred at (0, 0) and (1, 0),
+# inside the unit square, which is known in closed form
+def inner_integral(y1, x1):
+    return feasible_area(x1, y1)
+
+# Outer integral over (x1, y1), adaptive and vectorized
 def integrate():
-    total_integral = mpmath.mpf(0)
-    precision = 1e-12  # Define a small step size for numerical integration manually
-    
-    # Iterate over x1
-    x1 = x1_min
-    while x1 <= x1_max:
-        # Iterate over y1 within the limits of y1_min to y1_max(x1)
-        y1 = y1_min(x1)
-        while y1 <= y1_max(x1):
-            # Integrate over x2 for fixed x1 and y1
-            inner_integral_x2 = mpmath.quad(
-                lambda x2: mpmath.quad(
-                    lambda y2: integrand(x1, y1, x2, y2), [y2_min, y2_max]
-                ), [x2_min, x2_max]
-            )
-            total_integral += inner_integral_x2 * precision * precision
-            y1 += precision
-        x1 += precision
-    
-    return total_integral
+    return adaptive_integrate_triangle(inner_integral, x_max=x1_max, tol=tolerance)
 
-# Compute the probability
-P = 4 * integrate()
-print(f"Estimated Probability: {P:.10f}")
+if __name__ == "__main__":
+    # Compute the probability; the triangle of blue points is one of the 8 copies of
+    # the square under its symmetries, each with area 1/8
+    start_time = time.perf_counter()
+    integral, error = integrate()
+    P = 8 * integral
+    print(f"Estimated Probability: {P:.15f} (error estimate {8 * error:.1e}, "
+          f"{time.perf_counter() - start_time:.3f} seconds)")
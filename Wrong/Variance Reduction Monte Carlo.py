@@ -1,35 +1,51 @@
+import os
+import sys
+
 import numpy as np
-from scipy.stats.qmc import Sobol
 
-# Number of samples - much larger number needed for higher accuracy
-N = 100000000  # Adjust to an even larger number if possible for high accuracy
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "Correct"))
+from qmc import rqmc_estimate
+
+# Number of samples - 2**m per scrambled replicate, so every replicate keeps the balance of the Sobol sequence
+m = 23
+num_replicates = 16  # Independent scramblings; their spread gives the standard error
+seed = None  # Root seed of the scramblings
+
+
+def bounded_bisector_hits(buffers, n):
+    """
+    Count the samples whose x3 lies in [0, 1], for Sobol points held in chunk buffers.
+
+    Parameters:
+        buffers (ChunkBuffers): Buffers whose coordinate rows hold the Sobol
+                                coordinates (x1, x2, y2, u) in their first n columns.
+        n (int): The number of samples to evaluate.
 
-# Use Sobol sequence to generate quasi-random samples
-sampler = Sobol(d=4, scramble=True)
-samples = sampler.random(N)
+    Returns:
+        int: The number of samples with x3 in [0, 1].
+    """
+    # Extract x1, x2, y2 from [0, 1] range
+    x1, x2, y2, y1 = buffers.coords[:, :n]
 
-# Extract x1, x2, y2 from [0, 1] range
-x1 = samples[:, 0]
-x2 = samples[:, 1]
-y2 = samples[:, 2]
+    # Generate y1 based on the bounds: [0, min(x1, 1 - x1)]
+    y1 *= np.minimum(x1, 1 - x1)
 
-# Generate y1 based on the bounds: [0, min(x1, 1 - x1)]
-y1_upper_bound = np.minimum(x1, 1 - x1)
-y1 = samples[:, 3] * y1_upper_bound
+    # Calculate x3 for each sample
+    denominator = 2 * (x1 - x2)
+    # Avoid division by zero
+    valid_denominator = denominator != 0
 
-# Calculate x3 for each sample
-denominator = 2 * (x1 - x2)
-# Avoid division by zero
-valid_denominator = denominator != 0
+    # Only consider samples where the denominator is not zero
+    with np.errstate(divide='ignore', invalid='ignore'):
+        x3 = (x1**2 + y1**2 - x2**2 - y2**2) / denominator
 
-# Only consider samples where the denominator is not zero
-x3 = np.zeros(N)
-x3[valid_denominator] = (x1[valid_denominator]**2 + y1[valid_denominator]**2 - x2[valid_denominator]**2 - y2[valid_denominator]**2) / denominator[valid_denominator]
+    # Count how many values of x3 are in [0, 1]
+    return int(np.count_nonzero((x3 >= 0) & (x3 <= 1) & valid_denominator))
 
-# Count how many values of x3 are in [0, 1]
-count = np.sum((x3 >= 0) & (x3 <= 1) & valid_denominator)
 
-# Estimate the probability
-P = count / N
+if __name__ == "__main__":
+    # Use scrambled Sobol sequences to generate quasi-random samples, streamed in chunks
+    P, standard_error, estimates = rqmc_estimate(m, num_replicates, seed, kernel=bounded_bisector_hits)
 
-print(f"Estimated Probability: {P:.11f}")
+    print(f"Estimated Probability: {P:.11f} +- {standard_error:.2e} (standard error over {num_replicates} "
+          f"scramblings of {2**m} points)")